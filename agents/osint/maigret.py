@@ -14,7 +14,7 @@ from typing import List
 from langchain_core.tools import BaseTool
 
 from agents.base import LangChainAgent, AgentCapabilities
-from tools.maigret import MaigretUsernameTool, MaigretReportTool
+from tools.maigret import MaigretUsernameTool, MaigretBatchTool, MaigretReportTool
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +37,7 @@ class MaigretAgent(LangChainAgent):
             description="Username OSINT and identity research using Maigret (500+ platforms)",
             tools=[
                 "maigret_username_search",
+                "maigret_username_search_batch",
                 "maigret_report",
             ],
             supported_queries=[
@@ -53,6 +54,7 @@ class MaigretAgent(LangChainAgent):
         """Get Maigret tools."""
         return [
             MaigretUsernameTool(),
+            MaigretBatchTool(),
             MaigretReportTool(),
         ]
     
@@ -71,7 +73,14 @@ Available tools:
      - timeout: Seconds to wait per site (default: 30)
      - top_sites: Number of top sites to check (default: 100)
    
-2. **maigret_report** - Generate comprehensive identity report
+2. **maigret_username_search_batch** - Search several usernames in parallel
+   - Same search as maigret_username_search, run concurrently
+   - Use it for username variations instead of repeated single searches
+   - Parameters:
+     - usernames: List of exact usernames to search
+     - timeout / top_sites: As for maigret_username_search
+
+3. **maigret_report** - Generate comprehensive identity report
    - Deep search across 300 platforms
    - Cross-platform correlation analysis
    - Provides online identity strength assessment
@@ -87,7 +96,7 @@ For USERNAME research:
 
 For IDENTITY investigation:
 1. Search the primary username first
-2. Try common variations (with numbers, underscores, periods)
+2. Try common variations (with numbers, underscores, periods) in one maigret_username_search_batch call
 3. Cross-reference discovered profiles
 4. Assess online presence strength (high/medium/low)
 
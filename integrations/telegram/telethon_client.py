@@ -748,15 +748,20 @@ class TelethonReportPublisher:
     - Local backup on failure
     """
     
-    def __init__(self, target_dialog: Optional[str] = None):
+    def __init__(
+        self,
+        target_dialog: Optional[str] = None,
+        client: Optional[TelethonClient] = None,
+    ):
         """
         Initialize the publisher.
         
         Args:
             target_dialog: Default dialog to publish to
+            client: Client to publish with (defaults to the shared singleton)
         """
         # Use singleton client to avoid database locks
-        self.client = get_telegram_client()
+        self.client = client or get_telegram_client()
         self.target_dialog = target_dialog or os.getenv("TELEGRAM_TARGET_DIALOG", "")
         self.logger = logging.getLogger(self.__class__.__name__)
         self._connected = False
@@ -42,10 +42,17 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Imports: Maigret
 # =============================================================================
 from tools.maigret import (
+    _RESULT_CACHE,
     MaigretUsernameTool,
+    MaigretBatchTool,
     MaigretReportTool,
+    _build_report,
     _check_maigret_available,
+    _load_maigret_api,
+    _parse_output_line,
     _run_maigret_async,
+    _run_maigret_batch_async,
+    _run_maigret_sync,
 )
 
 # =============================================================================
@@ -76,6 +83,21 @@ def maigret_report_tool():
     return MaigretReportTool()
 
 
+@pytest.fixture(autouse=True)
+def clear_maigret_cache():
+    """Keep cached maigret results from leaking between tests."""
+    _RESULT_CACHE.clear()
+    yield
+    _RESULT_CACHE.clear()
+
+
+@pytest.fixture
+def maigret_cli_only():
+    """Force the maigret subprocess path by hiding the Python API."""
+    with patch('tools.maigret._load_maigret_api', return_value=None):
+        yield
+
+
 @pytest.fixture
 def mock_maigret_ndjson_output():
     """Sample NDJSON output from maigret."""
@@ -151,6 +173,23 @@ class TestMaigretToolInstantiation:
         assert "500+" in maigret_username_tool.description
         assert maigret_username_tool.args_schema is not None
 
+    def test_maigret_batch_tool_creation(self):
+        """Test MaigretBatchTool instantiation."""
+        tool = MaigretBatchTool()
+        assert tool.name == "maigret_username_search_batch"
+        assert 'usernames' in tool.args_schema.model_fields
+
+    def test_maigret_batch_rejects_empty_usernames(self):
+        """Test an empty batch is rejected with a reason."""
+        from pydantic import ValidationError
+
+        with pytest.raises(ValidationError):
+            MaigretBatchTool().args_schema(usernames=[])
+
+        result = asyncio.run(_run_maigret_batch_async([]))
+        assert result["success"] is False
+        assert result["error"] == "No usernames given"
+
     def test_maigret_report_tool_creation(self, maigret_report_tool):
         """Test MaigretReportTool instantiation."""
         assert maigret_report_tool is not None
@@ -168,11 +207,11 @@ class TestMaigretToolAvailability:
     def test_check_maigret_available(self):
         """Test maigret availability check."""
         result = _check_maigret_available()
-        # Should be boolean
-        assert isinstance(result, bool)
+        # Should be the resolved binary path, or None
+        assert result is None or isinstance(result, str)
         # If maigret is installed, should find it
         if shutil.which('maigret'):
-            assert result is True
+            assert result == shutil.which('maigret')
 
 
 # =============================================================================
@@ -224,34 +263,234 @@ class TestMaigretOutputParsing:
 # Maigret Mock Execution Tests
 # =============================================================================
 
+@pytest.mark.usefixtures("maigret_cli_only")
 class TestMaigretMockExecution:
     """Test Maigret execution with mocked subprocess."""
 
     @pytest.mark.asyncio
     async def test_maigret_not_installed(self):
         """Test behavior when maigret is not installed."""
-        with patch('tools.maigret._check_maigret_available', return_value=False):
+        with patch('tools.maigret._check_maigret_available', return_value=None):
             result = await _run_maigret_async("testuser", timeout=10, top_sites=5)
             
             assert result["success"] is False
             assert "not installed" in result["error"].lower()
             assert result["results"] == []
 
+    def test_maigret_sync_without_event_loop(self):
+        """Test sync wrapper works when no event loop is set."""
+        with patch('tools.maigret._check_maigret_available', return_value=None):
+            result = _run_maigret_sync("testuser", timeout=10, top_sites=5)
+
+            assert result["success"] is False
+            assert "not installed" in result["error"].lower()
+
     @pytest.mark.asyncio
     async def test_maigret_timeout_handling(self):
         """Test timeout handling in maigret execution."""
-        with patch('tools.maigret._check_maigret_available', return_value=True):
+        with patch('tools.maigret._check_maigret_available', return_value='/usr/bin/maigret'):
             with patch('asyncio.create_subprocess_exec') as mock_exec:
                 # Simulate a timeout
                 mock_process = AsyncMock()
-                mock_process.communicate = AsyncMock(side_effect=asyncio.TimeoutError())
+                mock_process.wait = AsyncMock(side_effect=asyncio.TimeoutError())
                 mock_exec.return_value = mock_process
                 
                 result = await _run_maigret_async("testuser", timeout=1, top_sites=1)
-                
+
                 assert result["success"] is False
                 assert "timed out" in result["error"].lower()
 
+    @pytest.mark.asyncio
+    async def test_maigret_uses_python_api_when_available(self):
+        """Test the in-process API is used instead of spawning maigret."""
+        def check(status, site_name, url):
+            result = MagicMock()
+            result.status = status
+            result.site_name = site_name
+            result.site_url_user = url
+            return {"status": result}
+
+        fake_search = AsyncMock(return_value={
+            "GitHub": check("Claimed", "GitHub", "https://github.com/testuser"),
+            "Facebook": check("Available", "Facebook", "https://facebook.com/testuser"),
+        })
+        fake_db = MagicMock()
+
+        with patch('tools.maigret._load_maigret_api', return_value=(fake_search, fake_db)):
+            with patch('asyncio.create_subprocess_exec') as mock_exec:
+                result = await _run_maigret_async("testuser", timeout=10, top_sites=5)
+
+                mock_exec.assert_not_called()
+                fake_db.ranked_sites_dict.assert_called_once_with(top=5, disabled=False)
+                assert result["success"] is True
+                assert result["results"] == [{
+                    "site": "GitHub",
+                    "url": "https://github.com/testuser",
+                    "status": "Claimed",
+                }]
+
+    @pytest.mark.asyncio
+    async def test_maigret_api_loaded_once_under_concurrency(self, monkeypatch):
+        """Test concurrent first searches share a single site database load."""
+        import time
+        import tools.maigret as maigret_module
+
+        loads = []
+
+        def slow_import():
+            loads.append(1)
+            time.sleep(0.05)
+            return ("search", "db")
+
+        monkeypatch.setattr(maigret_module, "_maigret_api", None)
+        monkeypatch.setattr(maigret_module, "_maigret_api_loaded", False)
+        monkeypatch.setattr(maigret_module, "_import_maigret_api", slow_import)
+
+        # The class fixture patches the module attribute; use the real loader
+        results = await asyncio.gather(*(
+            asyncio.to_thread(_load_maigret_api) for _ in range(8)
+        ))
+
+        assert loads == [1]
+        assert all(r == ("search", "db") for r in results)
+
+    @pytest.mark.asyncio
+    async def test_maigret_loaded_api_skips_worker_thread(self, monkeypatch):
+        """Test searches after the first load don't hop to a worker thread."""
+        import tools.maigret as maigret_module
+
+        fake_search = AsyncMock(return_value={})
+        monkeypatch.setattr(maigret_module, "_maigret_api_loaded", True)
+        with patch('tools.maigret._load_maigret_api', return_value=(fake_search, MagicMock())):
+            with patch('asyncio.to_thread') as mock_to_thread:
+                with patch('asyncio.create_subprocess_exec') as mock_exec:
+                    result = await _run_maigret_async("testuser", timeout=1, top_sites=1)
+
+        assert result["success"] is True
+        mock_to_thread.assert_not_called()
+        mock_exec.assert_not_called()
+        fake_search.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_maigret_repeat_search_uses_cache(self):
+        """Test a repeated search is served from cache without rerunning maigret."""
+        fake_search = AsyncMock(return_value={})
+
+        with patch('tools.maigret._load_maigret_api', return_value=(fake_search, MagicMock())):
+            first = await _run_maigret_async("testuser", timeout=10, top_sites=5)
+            second = await _run_maigret_async("testuser", timeout=10, top_sites=5)
+            await _run_maigret_async("testuser", timeout=10, top_sites=10)
+
+            assert first["success"] is True
+            assert second == first
+            assert fake_search.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_maigret_batch_runs_each_username(self):
+        """Test batch search runs every distinct username and merges results."""
+        async def fake_search(username, timeout, top_sites):
+            return {
+                "success": True,
+                "username": username,
+                "found_count": 1,
+                "results": [{"site": "GitHub", "url": f"https://github.com/{username}"}],
+            }
+
+        with patch('tools.maigret._run_maigret_async', side_effect=fake_search) as mock_run:
+            result = await _run_maigret_batch_async(["alice", "bob", "alice"], timeout=10, top_sites=5)
+
+            assert mock_run.call_count == 2
+            assert result["success"] is True
+            assert result["usernames"] == ["alice", "bob"]
+            assert result["found_count"] == 2
+            assert result["results"]["bob"]["results"][0]["url"] == "https://github.com/bob"
+
+    @pytest.mark.asyncio
+    async def test_maigret_timeout_kills_process(self):
+        """Test the maigret subprocess is killed and reaped on timeout."""
+        with patch('tools.maigret._check_maigret_available', return_value='/usr/bin/maigret'):
+            with patch('asyncio.create_subprocess_exec') as mock_exec:
+                mock_process = AsyncMock()
+                mock_process.returncode = None
+                mock_process.kill = MagicMock()
+                mock_process.wait = AsyncMock(side_effect=[asyncio.TimeoutError(), -9])
+                mock_exec.return_value = mock_process
+
+                result = await _run_maigret_async("testuser", timeout=1, top_sites=1)
+
+                assert result["success"] is False
+                mock_process.kill.assert_called_once()
+                assert mock_process.wait.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_maigret_failed_or_cancelled_search_kills_process(self):
+        """Test the subprocess is killed when reading fails or the caller cancels."""
+        started = asyncio.Event()
+
+        async def too_long():
+            raise ValueError("Separator is not found, and chunk exceed the limit")
+            yield
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+            yield
+
+        for stdout, cancel in ((too_long, False), (hang, True)):
+            with patch('tools.maigret._check_maigret_available', return_value='/usr/bin/maigret'):
+                with patch('asyncio.create_subprocess_exec') as mock_exec:
+                    mock_process = MagicMock()
+                    mock_process.returncode = None
+                    mock_process.stdout = stdout()
+                    mock_process.wait = AsyncMock(return_value=-9)
+                    mock_exec.return_value = mock_process
+
+                    task = asyncio.create_task(_run_maigret_async("testuser", timeout=1, top_sites=1))
+                    if cancel:
+                        await started.wait()
+                        task.cancel()
+                        with pytest.raises(asyncio.CancelledError):
+                            await task
+                    else:
+                        assert (await task)["success"] is False
+
+                    mock_process.kill.assert_called_once()
+                    mock_process.wait.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_maigret_parses_streamed_stdout(self):
+        """Test results are parsed from stdout lines as they arrive."""
+        # Lines as printed by `maigret --no-color` (QueryNotifyPrint)
+        lines = [
+            b"[*] Checking username testuser on:\n",
+            b"[+] GitHub: https://github.com/testuser\n",
+            b"        \xe2\x94\xa3\xe2\x95\xb8uid: 12345\n",
+            b"[-] Facebook: Not found!\n",
+            b"[?] Example: Connection error\n",
+            b"[+] Twitter: https://twitter.com/testuser\n",
+            b"[*] Search by username testuser returned 2 accounts.\n",
+        ]
+
+        with patch('tools.maigret._check_maigret_available', return_value='/usr/bin/maigret'):
+            with patch('asyncio.create_subprocess_exec') as mock_exec:
+                mock_process = AsyncMock()
+                mock_process.stdout.__aiter__.return_value = lines
+                mock_exec.return_value = mock_process
+
+                result = await _run_maigret_async("testuser", timeout=10, top_sites=5)
+
+                assert result["success"] is True
+                assert result["found_count"] == 2
+                assert result["results"] == [
+                    {"site": "GitHub", "url": "https://github.com/testuser", "status": "found"},
+                    {"site": "Twitter", "url": "https://twitter.com/testuser", "status": "found"},
+                ]
+
+    def test_maigret_output_line_site_falls_back_to_host(self):
+        """Test a found line without a site label is named after the URL's host."""
+        assert _parse_output_line(b"[+] https://gitlab.com/testuser\n")["site"] == "gitlab.com"
+        assert _parse_output_line(b"[-] GitLab: Not found!\n") is None
+
 
 # =============================================================================
 # Maigret Integration Tests (require actual tools installed)
@@ -343,18 +582,37 @@ class TestMaigretOutputFormat:
             assert isinstance(parsed, dict)
             assert "success" in parsed
 
+    def test_maigret_report_analysis(self):
+        """Test report identity strength is derived from profiles found."""
+        sites = [{"site": f"site{i}", "url": f"https://site{i}.com/u", "status": "Claimed"}
+                 for i in range(6)]
+        report = json.loads(_build_report(
+            {"success": True, "found_count": 6, "results": sites}, "test"
+        ))
+
+        assert report["profiles_found"] == 6
+        assert report["total_sites_checked"] == 300
+        assert report["analysis"]["cross_platform_presence"] is True
+        assert report["analysis"]["online_identity_strength"] == "medium"
+
+    def test_maigret_report_error(self):
+        """Test failed searches produce an error report."""
+        report = json.loads(_build_report({"success": False, "error": "boom"}, "test"))
+        assert report == {"error": "boom", "username": "test"}
+
 
 # =============================================================================
 # Maigret Error Handling Tests
 # =============================================================================
 
+@pytest.mark.usefixtures("maigret_cli_only")
 class TestMaigretErrorHandling:
     """Test error handling in Maigret tools."""
 
     @pytest.mark.asyncio
     async def test_maigret_handles_subprocess_error(self):
         """Test maigret handles subprocess errors gracefully."""
-        with patch('tools.maigret._check_maigret_available', return_value=True):
+        with patch('tools.maigret._check_maigret_available', return_value='/usr/bin/maigret'):
             with patch('asyncio.create_subprocess_exec') as mock_exec:
                 mock_exec.side_effect = OSError("Subprocess failed")
                 
@@ -368,16 +626,16 @@ class TestMaigretErrorHandling:
 # Maigret Command Generation Tests
 # =============================================================================
 
+@pytest.mark.usefixtures("maigret_cli_only")
 class TestMaigretCommandGeneration:
     """Test that correct Maigret commands are generated."""
 
     def test_maigret_command_includes_top_sites(self):
         """Verify maigret command includes --top-sites."""
         # This tests the command structure indirectly
-        with patch('tools.maigret._check_maigret_available', return_value=True):
+        with patch('tools.maigret._check_maigret_available', return_value='/usr/bin/maigret'):
             with patch('asyncio.create_subprocess_exec') as mock_exec:
                 mock_process = AsyncMock()
-                mock_process.communicate = AsyncMock(return_value=(b"", b""))
                 mock_exec.return_value = mock_process
                 
                 asyncio.get_event_loop().run_until_complete(
@@ -386,7 +644,7 @@ class TestMaigretCommandGeneration:
                 
                 # Check the command includes expected arguments
                 call_args = mock_exec.call_args[0]
-                assert 'maigret' in call_args
+                assert call_args[0] == '/usr/bin/maigret'
                 assert 'testuser' in call_args
                 assert '--top-sites' in call_args
                 assert '100' in call_args
@@ -756,6 +1014,24 @@ class TestHoleheMockExecution:
             assert result["success"] is False
             assert "not installed" in result["error"].lower()
 
+    def test_holehe_empty_result_caps_raw_output(self):
+        """Test the raw output of an empty scan is capped."""
+        from tools.holehe import _run_holehe_async, _MAX_RAW_OUTPUT_CHARS
+
+        output = b"[-] example.com\n" * 1000
+
+        with patch('tools.holehe._check_holehe_available', return_value=True):
+            with patch('asyncio.create_subprocess_exec') as mock_exec:
+                mock_process = MagicMock()
+                mock_process.communicate = AsyncMock(return_value=(output, b""))
+                mock_exec.return_value = mock_process
+
+                result = asyncio.run(_run_holehe_async("test@example.com"))
+
+                assert result["success"] is True
+                assert result["sites_used"] == []
+                assert result["raw_output"] == output.decode()[:_MAX_RAW_OUTPUT_CHARS]
+
 
 # =============================================================================
 # Holehe Integration Tests
@@ -1018,6 +1294,21 @@ class TestPhoneInfogaToolAvailability:
         binary = _find_phoneinfoga_binary()
         # Just test it returns None or a string
         assert binary is None or isinstance(binary, str)
+    
+    def test_phoneinfoga_refresh_binary(self):
+        """Test refresh_phoneinfoga re-resolves the cached binary."""
+        from tools.phoneinfoga import refresh_phoneinfoga, _find_phoneinfoga_binary
+        
+        try:
+            with patch('tools.phoneinfoga.shutil.which', return_value='/usr/bin/phoneinfoga'):
+                assert refresh_phoneinfoga() == 'phoneinfoga'
+            assert _find_phoneinfoga_binary() == 'phoneinfoga'
+            
+            with patch('tools.phoneinfoga.shutil.which', return_value=None):
+                assert refresh_phoneinfoga() is None
+            assert _find_phoneinfoga_binary() is None
+        finally:
+            refresh_phoneinfoga()
 
 
 # =============================================================================
@@ -1029,7 +1320,7 @@ class TestPhoneInfogaOutputParsing:
     
     def test_phoneinfoga_output_parsing(self):
         """Test parsing of phoneinfoga output."""
-        from tools.phoneinfoga import _parse_phoneinfoga_output
+        from tools.phoneinfoga import _PhoneInfogaStreamParser
         
         sample_output = """
 Country: Spain
@@ -1044,7 +1335,10 @@ Running scanner numverify...
 Found 2 results
 """
         
-        result = _parse_phoneinfoga_output(sample_output)
+        parser = _PhoneInfogaStreamParser()
+        for line in sample_output.splitlines(keepends=True):
+            parser.feed(line)
+        result = parser.result
         
         assert result["country"] == "Spain"
         assert result["carrier"] == "Movistar"
@@ -1053,6 +1347,20 @@ Found 2 results
         assert result["local_format"] == "612345678"
         assert result["international_format"] == "+34612345678"
         assert result["country_code"] == "34"
+        assert result["scanners"] == {"numverify": {"results": ["Found 2 results"]}}
+        assert parser.raw_lines is None
+
+    def test_phoneinfoga_parser_keeps_raw_lines_on_request(self):
+        """Test raw lines are only collected when include_raw is set."""
+        from tools.phoneinfoga import _PhoneInfogaStreamParser
+
+        lines = ["Country: Spain\n", "\n", "Valid: false\n"]
+        parser = _PhoneInfogaStreamParser(include_raw=True)
+        for line in lines:
+            parser.feed(line)
+
+        assert parser.raw_lines == lines
+        assert parser.result["valid"] is False
 
 
 # =============================================================================
@@ -1072,6 +1380,47 @@ class TestPhoneInfogaMockExecution:
             assert result["success"] is False
             assert "not installed" in result["error"].lower()
 
+    def test_phoneinfoga_streamed_output(self):
+        """Test stdout is parsed line by line as it is read."""
+        from tools.phoneinfoga import _run_phoneinfoga_async
+
+        lines = [b"Country: Spain\n", b"Carrier: Movistar\n",
+                 b"Running scanner numverify...\n", b"Found 2 results\n", b""]
+
+        with patch('tools.phoneinfoga._find_phoneinfoga_binary', return_value='phoneinfoga'):
+            with patch('asyncio.create_subprocess_exec') as mock_exec:
+                mock_process = MagicMock()
+                mock_process.stdout.readline = AsyncMock(side_effect=lines)
+                mock_process.wait = AsyncMock(return_value=0)
+                mock_process.returncode = 0
+                mock_exec.return_value = mock_process
+
+                result = asyncio.run(_run_phoneinfoga_async("+34612345678"))
+
+                assert result["success"] is True
+                assert result["country"] == "Spain"
+                assert result["carrier"] == "Movistar"
+                assert result["scanners_run"] == ["numverify"]
+                assert mock_process.stdout.readline.call_count == len(lines)
+
+
+    def test_phoneinfoga_read_error_kills_process(self):
+        """Test a failed read still kills and reaps the scan."""
+        from tools.phoneinfoga import _run_phoneinfoga_async
+
+        with patch('tools.phoneinfoga._find_phoneinfoga_binary', return_value='phoneinfoga'):
+            with patch('asyncio.create_subprocess_exec') as mock_exec:
+                mock_process = MagicMock()
+                mock_process.stdout.readline = AsyncMock(side_effect=ValueError("chunk exceed the limit"))
+                mock_process.wait = AsyncMock(return_value=-9)
+                mock_process.returncode = None
+                mock_exec.return_value = mock_process
+
+                result = asyncio.run(_run_phoneinfoga_async("+34612345678"))
+
+                assert result["success"] is False
+                mock_process.kill.assert_called_once()
+                mock_process.wait.assert_awaited_once()
 
 # =============================================================================
 # PhoneInfoga Integration Tests
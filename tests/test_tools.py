@@ -11,16 +11,34 @@ Run with: pytest tests/test_tools.py -v
 """
 
 import pytest
+import asyncio
+import json
+import time
+import threading
 import sys
 import os
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch, MagicMock
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from tools.base import UrlInput, WebSearchInput, TextAnalysisInput
-from tools.search import TavilySearchTool, DuckDuckGoSearchTool
-from tools.scraping import WebScraperTool, GoogleDorkBuilderTool
+from tools.base import (
+    UrlInput,
+    WebSearchInput,
+    TextAnalysisInput,
+    dumps_json,
+    http_session,
+    fetch_text,
+    close_http_session,
+    run_sync,
+    run_in_background,
+)
+from tools.search import TavilySearchTool, DuckDuckGoSearchTool, _parse_ddg_results
+from tools.scraping import WebScraperTool, GoogleDorkBuilderTool, _bounded_text
 from tools.analysis import IOCExtractorTool, TagExtractorTool
+from tools import base, search, scraping
 from tools.maigret import (
     MaigretUsernameTool,
     MaigretReportTool,
@@ -34,6 +52,14 @@ from tools.telegram import (
     TelegramMCPSendTool,
     TelegramMCPPublishReportTool,
     TelegramMCPListDialogsTool,
+    TelegramPublishTool,
+    _PUBLISH_INTERVAL,
+    _get_default_target,
+    _next_publish_at,
+    _reserve_publish_slot,
+    _run_coro_sync,
+    _wait_for_publish_slot,
+    refresh_default_target,
 )
 
 
@@ -248,6 +274,154 @@ class TestGoogleDorkBuilder:
         assert len(templates) > 0
 
 
+class TestTavilySearch:
+    """Test Tavily search with a mocked client."""
+
+    def test_client_reused_across_searches(self, monkeypatch):
+        """Test one TavilyClient serves repeated searches with the same key."""
+
+        if not search.TAVILY_AVAILABLE:
+            pytest.skip("tavily not installed")
+
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+        search._get_tavily_client.cache_clear()
+        client = MagicMock()
+        client.search.return_value = {
+            "answer": "Summary",
+            "results": [{"title": "T", "url": "https://t.example", "content": "C", "score": 0.9}],
+        }
+
+        with patch("tools.search.TavilyClient", return_value=client) as mock_cls:
+            tool = TavilySearchTool()
+            first = json.loads(asyncio.run(tool._arun("query")))
+            asyncio.run(tool._arun("query"))
+
+        search._get_tavily_client.cache_clear()
+        assert mock_cls.call_count == 1
+        assert client.search.call_count == 2
+        assert first["count"] == 2
+        assert first["results"][1]["url"] == "https://t.example"
+
+
+class TestDuckDuckGoParsing:
+    """Test DuckDuckGo HTML result parsing without network access."""
+
+    SAMPLE_HTML = """<html><body>
+    <div class="result results_links web-result"><div class="result__body">
+      <a class="result__a" href="https://a.example">First <b>Result</b></a>
+      <a class="result__snippet">Snippet one</a></div></div>
+    <div class="result__extras">not a result</div>
+    <div class="result"><a class="result__a" href="https://b.example">Second</a></div>
+    <div class="result"><span>no link</span></div>
+    </body></html>"""
+
+    def test_parse_results(self):
+        """Test titles, URLs and snippets are extracted from result blocks."""
+
+        results = _parse_ddg_results(self.SAMPLE_HTML, 10)
+
+        assert [r["url"] for r in results] == ["https://a.example", "https://b.example"]
+        assert results[0]["title"] == "FirstResult"
+        assert results[0]["content"] == "Snippet one"
+        assert results[1]["content"] == ""
+
+    def test_parsers_agree(self):
+        """Test the selectolax and BeautifulSoup parsers give the same results."""
+
+        if not search.SELECTOLAX_AVAILABLE:
+            pytest.skip("selectolax not installed")
+
+        for limit in (1, 10):
+            assert (search._parse_ddg_selectolax(self.SAMPLE_HTML, limit)
+                    == search._parse_ddg_bs4(self.SAMPLE_HTML, limit))
+
+    def test_sync_search_parses_off_tool_loop(self, monkeypatch):
+        """Test a sync search parses in the calling thread, not on the shared loop."""
+        threads = []
+        parse = search._parse_ddg_results
+
+        async def fake_fetch(url, timeout=30, ssl=True):
+            return 200, self.SAMPLE_HTML
+
+        def spy(html, max_results):
+            threads.append(threading.current_thread().name)
+            return parse(html, max_results)
+
+        monkeypatch.setattr(search, "fetch_text", fake_fetch)
+        monkeypatch.setattr(search, "_parse_ddg_results", spy)
+        result = DuckDuckGoSearchTool()._run("osint")
+
+        assert '"count":2' in result.replace(" ", "")
+        assert threads == [threading.current_thread().name]
+
+
+class TestWebScraperExtraction:
+    """Test HTML content extraction without network access."""
+
+    def test_extract_prefers_article(self):
+        """Test main content comes from the article element."""
+        tool = WebScraperTool()
+        html = """<html><head><title>Page</title>
+        <meta name="description" content="Desc"></head>
+        <body><nav>menu</nav><article>Main <b>text</b></article>
+        <a href="/x">Link</a><a href="#top">Top</a></body></html>"""
+        result = tool._extract_content(html, "https://example.com")
+
+        assert result["title"] == "Page"
+        assert result["meta_description"] == "Desc"
+        assert result["content"] == "Main text"
+        assert result["links"] == [{"text": "Link", "href": "/x"}]
+
+    def test_extract_keeps_selector_priority(self):
+        """Test content selectors are tried in order, not by document position."""
+        tool = WebScraperTool()
+        cases = [
+            ('<main>M</main><article>A</article>', 'A'),
+            ('<div class="post">P</div><div id="content">C</div>', 'C'),
+            ('<div class="entry">E</div><div class="post">P</div>', 'P'),
+            ('<div id="content">I</div><div class="x content">K</div>', 'K'),
+        ]
+        for body, expected in cases:
+            html = f"<html><body>{body}</body></html>"
+            assert tool._extract_with_lxml(html)["content"] == expected
+            assert tool._extract_with_bs4(html)["content"] == expected
+
+    def test_sync_scrape_extracts_off_tool_loop(self, monkeypatch):
+        """Test a sync scrape extracts in the calling thread, not on the shared loop."""
+        threads = []
+        tool = WebScraperTool()
+        extract = tool._extract_content
+
+        async def fake_fetch(url, timeout=30, ssl=True):
+            return 200, "<html><body><article>Body</article></body></html>"
+
+        def spy(html, url):
+            threads.append(threading.current_thread().name)
+            return extract(html, url)
+
+        monkeypatch.setattr(scraping, "fetch_text", fake_fetch)
+        object.__setattr__(tool, "_extract_content", spy)
+        result = tool._run("https://example.com")
+
+        assert '"Body"' in result
+        assert threads == [threading.current_thread().name]
+
+    def test_extract_truncates_long_body(self):
+        """Test body fallback text is capped at 5000 characters."""
+        tool = WebScraperTool()
+        html = "<html><body>" + "<p>word</p>" * 5000 + "</body></html>"
+        result = tool._extract_content(html, "https://example.com")
+
+        assert len(result["content"]) == 5003
+        assert result["content"].endswith("...")
+
+    def test_bounded_text_caps_single_chunk(self):
+        """Test one oversized text chunk is cut to the budget plus one."""
+
+        assert _bounded_text(["a b", "x" * 100000], limit=10) == "a b xxxxxxx"
+        assert _bounded_text([" a ", "", "b"], limit=10) == "a b"
+
+
 class TestTagExtractor:
     """Test tag extraction functionality."""
     
@@ -287,6 +461,279 @@ class TestToolBase:
         """Test TextAnalysisInput validation."""
         input_data = TextAnalysisInput(text="sample text")
         assert input_data.text == "sample text"
+    
+    def test_dumps_json_roundtrip(self):
+        """Test dumps_json produces valid JSON, stringifying unknown types."""
+        
+        ts = datetime(2025, 1, 1, 12, 0, 0)
+        result = json.loads(dumps_json({"ok": True, "items": [1, 2], "ts": ts}))
+        assert result["ok"] is True
+        assert result["items"] == [1, 2]
+        assert isinstance(result["ts"], str)
+    
+    def test_dumps_json_indent(self):
+        """Test dumps_json pretty-prints only when requested."""
+        assert "\n" not in dumps_json({"a": 1})
+        assert "\n  " in dumps_json({"a": 1}, indent=True)
+    
+    def test_fetch_text_reuses_background_session(self):
+        """Test fetches from separate per-request loops share one session."""
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = b"ok" if self.path == "/" else b"missing"
+                self.send_response(200 if self.path == "/" else 404)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/"
+        try:
+            sessions = []
+            for _ in range(3):
+                assert asyncio.run(fetch_text(url)) == (200, "ok")
+                sessions.append(base._http_session)
+            assert sessions[0] is sessions[1] is sessions[2]
+            assert not sessions[0].closed
+
+            assert asyncio.run(fetch_text(url + "missing")) == (404, "")
+            assert run_sync(fetch_text(url)) == (200, "ok")
+            assert base._http_session is sessions[0]
+
+            asyncio.run(close_http_session())
+            assert sessions[0].closed
+            assert base._http_session is None
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_http_session_closed_on_foreign_loop(self):
+        """Test a loop other than the background loop gets a per-call session."""
+
+        async def use_session():
+            async with http_session() as session:
+                assert not session.closed
+            return session
+
+        session = asyncio.run(use_session())
+        assert session.closed
+
+    def test_run_in_background_from_other_loops(self):
+        """Test run_in_background runs coroutines on one loop from any caller."""
+
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = asyncio.run(run_in_background(current_loop()))
+        second = asyncio.run(run_in_background(current_loop()))
+        assert first is second
+        assert run_sync(current_loop()) is first
+
+    def test_run_sync_with_and_without_running_loop(self):
+        """Test run_sync works from plain sync code and from inside a running loop."""
+        
+        async def answer():
+            await asyncio.sleep(0)
+            return 42
+        
+        assert run_sync(answer()) == 42
+        
+        async def caller():
+            # Sync tool call made while this thread's loop is running
+            return run_sync(answer())
+        
+        assert asyncio.run(caller()) == 42
+
+
+class LoopBoundTelegramClient:
+    """Fake client that, like Telethon, is bound to its first loop."""
+
+    def __init__(self):
+        self.loop = None
+        self.connects = 0
+
+    @property
+    def is_connected(self):
+        return self.loop is not None
+
+    def _check_loop(self):
+        if asyncio.get_running_loop() is not self.loop:
+            raise RuntimeError("The asyncio event loop must not change after connection")
+
+    async def connect(self):
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+            self.connects += 1
+        self._check_loop()
+        return True
+
+    async def send_message(self, chat_id, text, parse_mode="html"):
+        self._check_loop()
+        return {"success": True, "chat_id": chat_id}
+
+    async def send_report(self, report, query, chat_id=None, run_id=None, stats=None):
+        return await self.send_message(chat_id, report)
+
+    async def list_dialogs(self, limit=20):
+        self._check_loop()
+        return [{"name": "@channel"}]
+
+
+class TestTelegramTools:
+    """Test Telegram tool execution paths without credentials."""
+
+    def test_sync_run_inside_running_loop(self, monkeypatch):
+        """Test _run returns a JSON error, with or without a running loop."""
+
+        monkeypatch.delenv("TG_APP_ID", raising=False)
+        monkeypatch.delenv("TG_API_HASH", raising=False)
+        tool = TelegramMCPListDialogsTool()
+
+        result = json.loads(tool._run())
+        assert result["dialogs"] == []
+        assert "error" in result
+
+        async def caller():
+            return tool._run()
+
+        assert json.loads(asyncio.run(caller()))["dialogs"] == []
+
+    def test_arun_from_separate_loops_reuses_client(self, monkeypatch):
+        """Test _arun calls from different asyncio.run loops share one client."""
+
+        client = LoopBoundTelegramClient()
+        monkeypatch.setattr("tools.telegram._client", client)
+        send_tool = TelegramMCPSendTool()
+        list_tool = TelegramMCPListDialogsTool()
+        publish_tool = TelegramMCPPublishReportTool()
+
+        for _ in range(2):
+            result = json.loads(asyncio.run(send_tool._arun("@channel", "hello")))
+            assert result["success"] is True
+            result = json.loads(asyncio.run(list_tool._arun()))
+            assert result["count"] == 1
+        result = json.loads(asyncio.run(
+            publish_tool._arun("report", "query", dialog_name="@loop-test")
+        ))
+        assert result["success"] is True
+        assert json.loads(send_tool._run("@channel", "sync"))["success"] is True
+        assert client.connects == 1
+
+    def test_publish_sends_report_to_publisher(self, monkeypatch):
+        """Test the report goes to the publisher as given and its length is reported."""
+
+        client = LoopBoundTelegramClient()
+        sent = []
+
+        async def send_report(report, query, chat_id=None, run_id=None, stats=None):
+            sent.append((report, query, chat_id))
+            return await client.send_message(chat_id, report)
+
+        client.send_report = send_report
+        monkeypatch.setattr("tools.telegram._client", client)
+
+        report = "x" * 10_000
+        tool = TelegramMCPPublishReportTool()
+        result = json.loads(tool._run(report, "query", dialog_name="test-dialog-report"))
+
+        assert result["success"] is True
+        assert result["report_length"] == len(report)
+        assert sent == [(report, "query", "test-dialog-report")]
+
+    def test_publish_slots_are_spaced_per_dialog(self):
+        """Test back-to-back publishes to one dialog are spaced out."""
+
+        now = time.monotonic()
+        first = _reserve_publish_slot("test-dialog-a")
+        second = _reserve_publish_slot("test-dialog-a")
+        assert first <= time.monotonic()
+        assert second - first == _PUBLISH_INTERVAL
+        assert _reserve_publish_slot("test-dialog-b") - now < _PUBLISH_INTERVAL
+
+    def test_cancelled_publish_wait_releases_slot(self, monkeypatch):
+        """Test a publish cancelled while waiting gives its slot back."""
+
+        monkeypatch.setattr("tools.telegram._PUBLISH_INTERVAL", 5.0)
+        _reserve_publish_slot("test-dialog-cancel")
+        queued_until = _next_publish_at["test-dialog-cancel"]
+
+        async def cancel_waiting_publish():
+            task = asyncio.create_task(_wait_for_publish_slot("test-dialog-cancel"))
+            await asyncio.sleep(0.01)
+            assert _next_publish_at["test-dialog-cancel"] == queued_until + 5.0
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_waiting_publish())
+        assert _next_publish_at["test-dialog-cancel"] == queued_until
+
+    def test_sync_publish_pacing_not_timed(self, monkeypatch):
+        """Test waiting for a publish slot does not count toward the sync timeout."""
+
+        monkeypatch.setattr("tools.telegram._client", LoopBoundTelegramClient())
+        monkeypatch.setattr("tools.telegram._PUBLISH_INTERVAL", 0.3)
+        monkeypatch.setattr("tools.telegram._SYNC_TIMEOUT", 0.2)
+        _reserve_publish_slot("test-dialog-sync")
+
+        tool = TelegramMCPPublishReportTool()
+        result = json.loads(tool._run("report", "query", dialog_name="test-dialog-sync"))
+        assert result["success"] is True
+
+    def test_refresh_default_target(self, monkeypatch):
+        """Test the cached default dialog follows the environment on refresh."""
+
+        # Restore the module's cached value after the test
+        monkeypatch.setattr("tools.telegram._default_target", None)
+        monkeypatch.setenv("TELEGRAM_TARGET_DIALOG", "@first")
+        assert refresh_default_target() == "@first"
+
+        monkeypatch.setenv("TELEGRAM_TARGET_DIALOG", "@second")
+        assert _get_default_target() == "@first"
+        assert refresh_default_target() == "@second"
+
+        monkeypatch.delenv("TELEGRAM_TARGET_DIALOG")
+        assert refresh_default_target() == ""
+
+    def test_publish_tool_sends_without_nested_tool(self, monkeypatch):
+        """Test TelegramPublishTool reports missing target and send errors."""
+
+        monkeypatch.setattr("tools.telegram._default_target", "")
+        monkeypatch.delenv("TG_APP_ID", raising=False)
+        monkeypatch.delenv("TG_API_HASH", raising=False)
+        tool = TelegramPublishTool()
+
+        result = json.loads(tool._run("hello"))
+        assert result["success"] is False
+        assert "TELEGRAM_TARGET_DIALOG" in result["error"]
+
+        result = json.loads(tool._run("hello", chat_id="@someone"))
+        assert result["success"] is False
+        assert result["error"]
+
+    def test_sync_call_timeout_cancels_coroutine(self, monkeypatch):
+        """Test a timed-out sync call is cancelled and returns a JSON error."""
+
+        monkeypatch.setattr("tools.telegram._SYNC_TIMEOUT", 0.05)
+        cancelled = []
+
+        async def slow_send():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "sent"
+
+        result = json.loads(_run_coro_sync(slow_send()))
+        assert result["success"] is False
+        assert "Timeout" in result["error"]
+        assert cancelled == [True]
 
 
 class TestToolsIntegration:
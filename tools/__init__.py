@@ -40,6 +40,7 @@ from tools.analysis import (
 # Modern OSINT tools (replacing OSRFramework)
 from tools.maigret import (
     MaigretUsernameTool,
+    MaigretBatchTool,
     MaigretReportTool,
 )
 from tools.bbot import (
@@ -108,6 +109,7 @@ def get_maigret_tools():
     """Get Maigret username OSINT tools."""
     return [
         MaigretUsernameTool(),
+        MaigretBatchTool(),
         MaigretReportTool(),
     ]
 
@@ -179,6 +181,7 @@ __all__ = [
     'TagExtractorTool',
     # Maigret (username OSINT)
     'MaigretUsernameTool',
+    'MaigretBatchTool',
     'MaigretReportTool',
     # bbot (attack surface)
     'BbotSubdomainTool',
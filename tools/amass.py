@@ -29,6 +29,8 @@ from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
+from tools.base import dumps_json
+
 logger = logging.getLogger(__name__)
 
 # Default amass binary locations
@@ -358,7 +360,7 @@ Note: Passive mode is recommended for stealth. Active mode performs DNS bruting
         result = asyncio.run(
             _run_amass_enum_async(domain, passive, timeout)
         )
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
     
     async def _arun(
         self,
@@ -369,7 +371,7 @@ Note: Passive mode is recommended for stealth. Active mode performs DNS bruting
     ) -> str:
         """Run amass enum asynchronously."""
         result = await _run_amass_enum_async(domain, passive, timeout)
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
 
 
 class AmassIntelTool(BaseTool):
@@ -408,7 +410,7 @@ Note: Organization name should match official registrations for best results.
         result = asyncio.run(
             _run_amass_intel_async(org, timeout)
         )
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
     
     async def _arun(
         self,
@@ -418,7 +420,7 @@ Note: Organization name should match official registrations for best results.
     ) -> str:
         """Run amass intel asynchronously."""
         result = await _run_amass_intel_async(org, timeout)
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
 
 
 # =============================================================================
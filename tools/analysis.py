@@ -12,7 +12,6 @@ These tools are used by agents to extract evidence and IOCs from content.
 """
 
 import re
-import json
 import logging
 from typing import Optional, Type, List, Dict, Any
 from collections import Counter
@@ -22,7 +21,7 @@ from pydantic import BaseModel
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
-from tools.base import TextAnalysisInput
+from tools.base import TextAnalysisInput, dumps_json
 
 logger = logging.getLogger(__name__)
 
@@ -115,7 +114,7 @@ class IOCExtractorTool(BaseTool):
                 
                 indicators.append(indicator)
         
-        return json.dumps({
+        return dumps_json({
             "count": len(indicators),
             "indicators": indicators
         })
@@ -204,7 +203,7 @@ class TagExtractorTool(BaseTool):
             if word not in common_words
         ]
         
-        return json.dumps({
+        return dumps_json({
             "categorized_tags": found_tags,
             "potential_names": potential_names[:10],
             "top_keywords": top_keywords,
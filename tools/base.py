@@ -9,8 +9,224 @@ This module provides:
 - Base tool utilities
 """
 
+import json
+import atexit
+import asyncio
+import logging
+import threading
+import contextlib
+import concurrent.futures
+
+import aiohttp
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Optional, List, Coroutine, Tuple, AsyncIterator
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Serialization
+# =============================================================================
+
+def dumps_json(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize a tool result to a JSON string.
+    
+    Uses orjson when installed and falls back to the standard library.
+    Values that are not natively serializable are converted with str().
+    
+    Args:
+        obj: The object to serialize
+        indent: Pretty-print with 2-space indentation
+        
+    Returns:
+        JSON string
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, default=str)
+
+
+# =============================================================================
+# Sync Execution
+# =============================================================================
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop serving sync tool calls, starting it on first use."""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name="tools-event-loop",
+                daemon=True
+            ).start()
+            _background_loop = loop
+    return _background_loop
+
+
+def run_sync(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = 60) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    The coroutine runs on a single persistent background event loop, so a
+    sync call works whether or not the caller's thread already runs a loop,
+    and loop-bound resources like the shared HTTP session stay warm.
+    
+    Args:
+        coro: The coroutine to run
+        timeout: Maximum seconds to wait for the result
+        
+    Returns:
+        The coroutine's result
+    """
+    loop = _get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the background tool loop")
+    
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+async def run_in_background(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Await a coroutine on the shared background loop from any event loop.
+    
+    Loop-bound resources such as the shared HTTP session live on the
+    background loop, so async tool calls made from short-lived
+    per-request loops hop there to use them. Cancelling the caller cancels
+    the coroutine on the background loop.
+    
+    Args:
+        coro: The coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    loop = _get_background_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+# =============================================================================
+# HTTP Session
+# =============================================================================
+
+# Default headers for tool HTTP requests
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+# Shared session; only created, used and closed on the background loop
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+@contextlib.asynccontextmanager
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Get an aiohttp session for the running event loop.
+    
+    On the background loop this is the shared session, which keeps
+    connections, DNS lookups and TLS sessions warm across tool calls.
+    On any other loop a session is opened and closed around the block,
+    since a session cannot outlive the loop it was created on.
+    
+    Yields:
+        ClientSession usable on the current loop (callers must not close it)
+    """
+    global _http_session
+    
+    if asyncio.get_running_loop() is not _background_loop:
+        async with aiohttp.ClientSession(headers=HTTP_HEADERS) as session:
+            yield session
+        return
+    
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+            headers=HTTP_HEADERS
+        )
+    yield _http_session
+
+
+async def _fetch_text(url: str, timeout: float, ssl: bool) -> Tuple[int, str]:
+    """GET a URL with the session of the running loop."""
+    async with http_session() as session:
+        async with session.get(
+            url,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            ssl=ssl
+        ) as response:
+            if response.status != 200:
+                return response.status, ""
+            return response.status, await response.text()
+
+
+async def fetch_text(url: str, timeout: float = 30, ssl: bool = True) -> Tuple[int, str]:
+    """
+    GET a URL through the shared HTTP session.
+    
+    The request runs on the background loop whatever loop the caller is
+    on; only the response text comes back, so parsing stays with the caller.
+    
+    Args:
+        url: URL to fetch
+        timeout: Total request timeout in seconds
+        ssl: Verify TLS certificates
+        
+    Returns:
+        (HTTP status, body text); the body is "" unless the status is 200
+    """
+    return await run_in_background(_fetch_text(url, timeout, ssl))
+
+
+async def _close_shared_http_session() -> None:
+    """Close the shared session; must run on the background loop."""
+    global _http_session
+    
+    session, _http_session = _http_session, None
+    if session is not None:
+        await session.close()
+
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session, e.g. on application shutdown."""
+    await run_in_background(_close_shared_http_session())
+
+
+@atexit.register
+def _close_http_session_at_exit() -> None:
+    """Close the shared session at interpreter exit."""
+    if _http_session is None or _http_session.closed:
+        return
+    try:
+        run_sync(_close_shared_http_session(), timeout=5)
+    except Exception as e:
+        logger.debug(f"Failed to close HTTP session: {e}")
 
 
 # =============================================================================
@@ -29,6 +29,8 @@ from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
+from tools.base import dumps_json
+
 logger = logging.getLogger(__name__)
 
 
@@ -283,7 +285,7 @@ Example usage: Search for subdomains of a company's main domain."""
             result["subdomains"] = list(set(subdomains))
             result["subdomain_count"] = len(result["subdomains"])
         
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result, indent=True)
     
     async def _arun(
         self,
@@ -308,7 +310,7 @@ Example usage: Search for subdomains of a company's main domain."""
             result["subdomains"] = list(set(subdomains))
             result["subdomain_count"] = len(result["subdomains"])
         
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result, indent=True)
 
 
 # =============================================================================
@@ -369,7 +371,7 @@ Example usage: Analyze what technologies a website is using."""
                 "potential_issues": vulnerabilities
             }
         
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result, indent=True)
     
     async def _arun(
         self,
@@ -405,7 +407,7 @@ Example usage: Analyze what technologies a website is using."""
                 "potential_issues": vulnerabilities
             }
         
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result, indent=True)
 
 
 # =============================================================================
@@ -456,7 +458,7 @@ Example usage: Find employee emails for a target organization."""
             result["emails"] = list(set(emails))
             result["email_count"] = len(result["emails"])
         
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result, indent=True)
     
     async def _arun(
         self,
@@ -480,4 +482,4 @@ Example usage: Find employee emails for a target organization."""
             result["emails"] = list(set(emails))
             result["email_count"] = len(result["emails"])
         
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result, indent=True)
@@ -14,7 +14,6 @@ Provides:
 - HoleheEmailTool: Check email registration across 100+ platforms
 """
 
-import json
 import logging
 import asyncio
 import subprocess
@@ -28,8 +27,13 @@ from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
+from tools.base import dumps_json
+
 logger = logging.getLogger(__name__)
 
+# Raw CLI output kept in empty results; holehe prints a line per site
+_MAX_RAW_OUTPUT_CHARS = 2000
+
 
 # =============================================================================
 # Input Schemas
@@ -175,7 +179,7 @@ async def _run_holehe_async(
             "sites_used_count": len(parsed["used"]),
             "sites_not_used_count": len(parsed["not_used"]) if not only_used else "N/A",
             "rate_limited_count": len(parsed["rate_limited"]),
-            "raw_output": output if len(parsed["used"]) == 0 else None
+            "raw_output": output[:_MAX_RAW_OUTPUT_CHARS] if not parsed["used"] else None
         }
         
     except asyncio.TimeoutError:
@@ -239,7 +243,7 @@ Example usage:
         result = asyncio.run(
             _run_holehe_async(email, timeout, only_used)
         )
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
     
     async def _arun(
         self,
@@ -250,7 +254,7 @@ Example usage:
     ) -> str:
         """Run holehe asynchronously."""
         result = await _run_holehe_async(email, timeout, only_used)
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
 
 
 # =============================================================================
@@ -10,24 +10,33 @@ It searches for usernames across 500+ platforms with better accuracy.
 GitHub: https://github.com/soxoj/maigret
 Install: pip install maigret
 
+Searches run in-process through maigret's Python API when the package is
+importable, falling back to the maigret CLI otherwise.
+
 Provides:
 - MaigretUsernameTool: Search username across platforms
+- MaigretBatchTool: Search several usernames concurrently
 - MaigretReportTool: Generate detailed report from search
 """
 
-import json
 import logging
 import asyncio
+import functools
+import re
 import subprocess
 import shutil
-import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Type, List, Any
+from typing import Optional, Type, List, Any, Dict, Tuple
+from urllib.parse import urlsplit
 
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
+from tools.base import dumps_json
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +51,13 @@ class MaigretUsernameInput(BaseModel):
     top_sites: int = Field(default=100, description="Only check top N sites by popularity")
 
 
+class MaigretBatchInput(BaseModel):
+    """Input for Maigret multi-username search."""
+    usernames: List[str] = Field(min_length=1, description="Usernames to search across platforms")
+    timeout: int = Field(default=30, description="Timeout per site in seconds")
+    top_sites: int = Field(default=100, description="Only check top N sites by popularity")
+
+
 class MaigretReportInput(BaseModel):
     """Input for Maigret report generation."""
     username: str = Field(description="Username to investigate")
@@ -52,9 +68,199 @@ class MaigretReportInput(BaseModel):
 # Helper Functions
 # =============================================================================
 
-def _check_maigret_available() -> bool:
-    """Check if maigret is installed and available."""
-    return shutil.which('maigret') is not None
+# Maigret statuses (lowercased) that mean the account exists
+_FOUND_STATUSES = frozenset({"claimed", "found"})
+
+# Profile URL in a plain-text maigret result line
+_URL_RE = re.compile(r'https?://\S+')
+
+# Sites covered by the comprehensive report search
+_REPORT_TOP_SITES = 300
+
+# Maximum maigret searches run at once by batch searches
+_BATCH_CONCURRENCY = 8
+
+# Successful search results, keyed by (username, top_sites).
+# Agents often repeat a lookup within a session; a cache hit skips the search.
+_RESULT_CACHE: Dict[Tuple[str, int], Tuple[float, dict]] = {}
+_RESULT_CACHE_TTL = 3600  # seconds
+_RESULT_CACHE_MAXSIZE = 256
+
+# maigret API (search coroutine, site database), loaded on first use
+_maigret_api: Optional[tuple] = None
+_maigret_api_loaded = False
+_maigret_api_lock = threading.Lock()
+
+# Logger handed to maigret's API. Per-site check failures are warnings there;
+# keep the CLI's default ERROR level so they don't flood the application log.
+_maigret_logger = logger.getChild('engine')
+_maigret_logger.setLevel(logging.ERROR)
+
+
+@functools.lru_cache(maxsize=1)
+def _check_maigret_available() -> Optional[str]:
+    """
+    Check if maigret is installed and available.
+    
+    The lookup is cached for the life of the process.
+    
+    Returns:
+        Absolute path to the maigret executable, or None if not installed
+    """
+    return shutil.which('maigret')
+
+
+def _get_cached_result(username: str, top_sites: int) -> Optional[dict]:
+    """Return a cached search result if present and not expired."""
+    key = (username, top_sites)
+    entry = _RESULT_CACHE.get(key)
+    if entry is None:
+        return None
+    
+    stored_at, result = entry
+    if time.monotonic() - stored_at > _RESULT_CACHE_TTL:
+        _RESULT_CACHE.pop(key, None)
+        return None
+    return result
+
+
+def _cache_result(username: str, top_sites: int, result: dict) -> None:
+    """Store a search result, evicting the oldest entry when full."""
+    key = (username, top_sites)
+    _RESULT_CACHE.pop(key, None)
+    if len(_RESULT_CACHE) >= _RESULT_CACHE_MAXSIZE:
+        # Dicts keep insertion order, so the first key is the oldest
+        _RESULT_CACHE.pop(next(iter(_RESULT_CACHE)), None)
+    _RESULT_CACHE[key] = (time.monotonic(), result)
+
+
+def _extract_api_site_info(site_name: str, site_result: dict) -> Optional[dict]:
+    """Extract site info from a maigret API result, or None if the account wasn't found."""
+    check = site_result.get("status")
+    if check is None:
+        return None
+    
+    status_str = str(check.status)
+    if status_str.lower() not in _FOUND_STATUSES:
+        return None
+    
+    return {
+        "site": check.site_name or site_name,
+        "url": check.site_url_user,
+        "status": status_str
+    }
+
+
+def _parse_output_line(raw_line: bytes) -> Optional[dict]:
+    """
+    Parse one line of maigret CLI output.
+    
+    The CLI prints a "[+] Site: URL" line for each found account (JSON
+    reports only go to files, never to stdout).
+    
+    Returns:
+        Found-site dict, or None if the line doesn't report a found account
+    """
+    # Filter on the raw bytes; only lines that can hold a result get decoded
+    if b'[+]' in raw_line or b'Claimed' in raw_line:
+        line = raw_line.decode('utf-8', errors='ignore')
+        match = _URL_RE.search(line)
+        if match:
+            url = match.group(0)
+            # Site name as the API reports it, falling back to the URL's host
+            _, _, label = line[:match.start()].partition('[+] ')
+            site, sep, _ = label.partition(': ')
+            site = site.strip() if sep else ""
+            return {
+                "site": site or urlsplit(url).hostname or url,
+                "url": url,
+                "status": "found"
+            }
+    
+    return None
+
+
+def _import_maigret_api() -> Optional[tuple]:
+    """Import maigret's search coroutine and parse its bundled site database."""
+    try:
+        import maigret
+        from maigret import search
+        from maigret.sites import MaigretDatabase
+    except ImportError:
+        return None
+    
+    db_path = Path(maigret.__file__).parent / "resources" / "data.json"
+    try:
+        db = MaigretDatabase().load_from_path(str(db_path))
+    except Exception as e:
+        logger.warning(f"Could not load maigret site database, using CLI: {e}")
+        return None
+    
+    return search, db
+
+
+def _load_maigret_api() -> Optional[tuple]:
+    """
+    Get maigret's search coroutine and site database, loading them once.
+    
+    Both are slow (parsing the database takes seconds). The load runs under
+    a lock, so the concurrent searches of a batch wait for a single load
+    instead of each parsing the database.
+    
+    Returns:
+        (search coroutine, MaigretDatabase) tuple, or None if the maigret
+        package is not importable
+    """
+    global _maigret_api, _maigret_api_loaded
+    
+    if not _maigret_api_loaded:
+        with _maigret_api_lock:
+            if not _maigret_api_loaded:
+                _maigret_api = _import_maigret_api()
+                _maigret_api_loaded = True
+    return _maigret_api
+
+
+async def _search_maigret_api(
+    api: tuple,
+    username: str,
+    timeout: int,
+    top_sites: int
+) -> List[dict]:
+    """
+    Search a username with maigret's Python API.
+    
+    Avoids the interpreter start-up, module imports and database load that
+    every CLI invocation pays, plus the stdout round-trip.
+    
+    Returns:
+        List of found sites
+    """
+    search, db = api
+    results = await search(
+        username=username,
+        # Skip disabled sites, as the CLI does unless --use-disabled-sites
+        site_dict=db.ranked_sites_dict(top=top_sites, disabled=False),
+        logger=_maigret_logger,
+        timeout=timeout,
+        no_progressbar=True,
+    )
+    
+    parsed = (_extract_api_site_info(name, site_result) for name, site_result in results.items())
+    return [info for info in parsed if info is not None]
+
+
+async def _read_maigret_stdout(process: asyncio.subprocess.Process) -> List[dict]:
+    """
+    Parse maigret CLI output line by line while the search runs.
+    
+    Returns:
+        List of found sites
+    """
+    parsed = (_parse_output_line(raw_line) async for raw_line in process.stdout)
+    found_sites = [info async for info in parsed if info is not None]
+    await process.wait()
+    return found_sites
 
 
 async def _run_maigret_async(
@@ -75,121 +281,169 @@ async def _run_maigret_async(
     Returns:
         Dictionary with search results
     """
-    if not _check_maigret_available():
+    cached = _get_cached_result(username, top_sites)
+    if cached is not None:
+        logger.debug(f"Using cached maigret result for {username} (top {top_sites})")
+        return cached
+    
+    # Prefer the in-process API; fall back to the CLI if it can't be imported.
+    # Only the first load is slow enough to need a worker thread.
+    if _maigret_api_loaded:
+        api = _load_maigret_api()
+    else:
+        api = await asyncio.to_thread(_load_maigret_api)
+    maigret_path = _check_maigret_available() if api is None else None
+    if api is None and not maigret_path:
         return {
             "success": False,
             "error": "maigret not installed. Install with: pip install maigret",
             "results": []
         }
     
-    # Create temporary directory for output
-    with tempfile.TemporaryDirectory() as tmpdir:
-        output_dir = Path(tmpdir)
-        
-        # Build command according to maigret documentation
-        # maigret USERNAME --top-sites N --timeout T -J ndjson -fo OUTPUT_FOLDER
-        cmd = [
-            'maigret',
-            username,
-            '--timeout', str(timeout),
-            '--top-sites', str(top_sites),
-            '-J', 'ndjson',  # JSON output in ndjson format
-            '-fo', str(output_dir),  # folder output
-        ]
-        
-        try:
+    search_timeout = timeout * top_sites / 10 + 120  # Dynamic timeout based on sites
+    process = None
+    try:
+        if api is not None:
+            found_sites = await asyncio.wait_for(
+                _search_maigret_api(api, username, timeout, top_sites),
+                timeout=search_timeout
+            )
+        else:
+            # Build command according to maigret documentation
+            # No report files are requested: results are parsed from stdout as
+            # maigret prints them, avoiding a temporary output folder round-trip.
+            cmd = [
+                maigret_path,
+                username,
+                '--timeout', str(timeout),
+                '--top-sites', str(top_sites),
+                '--no-color',
+                '--no-progressbar',
+            ]
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.DEVNULL
             )
-            
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout * top_sites / 10 + 120  # Dynamic timeout based on sites
+            found_sites = await asyncio.wait_for(
+                _read_maigret_stdout(process),
+                timeout=search_timeout
             )
-            
-            # Parse NDJSON output - maigret creates files like: report_USERNAME_ndjson.json
-            found_sites = []
-            
-            def extract_site_info(entry: dict) -> dict:
-                """Extract site info from maigret entry, handling nested status."""
-                # Status can be nested in entry["status"]["status"] or directly in entry["status"]
-                status_data = entry.get("status", {})
-                if isinstance(status_data, dict):
-                    status_str = status_data.get("status", "")
-                    site_name = status_data.get("site_name", entry.get("sitename", ""))
-                else:
-                    status_str = str(status_data)
-                    site_name = entry.get("sitename", "")
-                
-                return {
-                    "site": site_name or entry.get("sitename", ""),
-                    "url": entry.get("url_user", entry.get("url", "")),
-                    "status": status_str
-                }
-            
-            # Look for all json/ndjson files in output directory (maigret uses *_ndjson.json format)
-            for output_file in list(output_dir.glob(f"*{username}*.json")) + list(output_dir.glob(f"*{username}*.ndjson")):
-                try:
-                    with open(output_file, 'r') as f:
-                        content = f.read()
-                        # Try parsing as NDJSON (one JSON object per line)
-                        for line in content.strip().split('\n'):
-                            line = line.strip()
-                            if line:
-                                try:
-                                    entry = json.loads(line)
-                                    info = extract_site_info(entry)
-                                    if info["status"].lower() in ["claimed", "found"]:
-                                        found_sites.append(info)
-                                except json.JSONDecodeError:
-                                    continue
-                except Exception as e:
-                    logger.debug(f"Error reading {output_file}: {e}")
-            
-            # Parse stdout for results if no files found
-            if not found_sites:
-                output = stdout.decode('utf-8', errors='ignore')
-                for line in output.split('\n'):
-                    if '[+]' in line or 'Claimed' in line:
-                        # Extract site info from output line
-                        parts = line.strip().split()
-                        url = None
-                        for part in parts:
-                            if part.startswith('http'):
-                                url = part
-                                break
-                        if url:
-                            found_sites.append({
-                                "site": url.split('/')[2] if len(url.split('/')) > 2 else url,
-                                "url": url,
-                                "status": "found"
-                            })
-            
-            return {
-                "success": True,
-                "username": username,
-                "sites_checked": top_sites,
-                "found_count": len(found_sites),
-                "results": found_sites,
-                "error": None
-            }
-            
-        except asyncio.TimeoutError:
-            return {
-                "success": False,
-                "username": username,
-                "error": "Maigret search timed out",
-                "results": []
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "username": username,
-                "error": str(e),
-                "results": []
-            }
+        
+        result = {
+            "success": True,
+            "username": username,
+            "sites_checked": top_sites,
+            "found_count": len(found_sites),
+            "results": found_sites,
+            "error": None
+        }
+        # Only successful searches are cached; errors and timeouts are retried
+        _cache_result(username, top_sites, result)
+        return result
+        
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "username": username,
+            "error": "Maigret search timed out",
+            "results": []
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "username": username,
+            "error": str(e),
+            "results": []
+        }
+    finally:
+        # Don't leave maigret running (and holding sockets) with no consumer,
+        # whether the search timed out, failed or was cancelled
+        if process is not None and process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+
+async def _run_maigret_batch_async(
+    usernames: List[str],
+    timeout: int = 30,
+    top_sites: int = 100
+) -> dict:
+    """
+    Run maigret for several usernames concurrently.
+    
+    Each search is network-bound, so overlapping them cuts total time to
+    roughly that of the slowest username. At most _BATCH_CONCURRENCY
+    searches run at the same time.
+    
+    Args:
+        usernames: The usernames to search (duplicates are ignored)
+        timeout: Timeout per site
+        top_sites: Only check top N sites
+        
+    Returns:
+        Dictionary with per-username search results
+    """
+    usernames = list(dict.fromkeys(usernames))
+    if not usernames:
+        return {
+            "success": False,
+            "error": "No usernames given",
+            "usernames": [],
+            "results": {}
+        }
+    
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+    
+    async def search(username: str) -> dict:
+        async with semaphore:
+            return await _run_maigret_async(username, timeout, top_sites)
+    
+    results = await asyncio.gather(*(search(u) for u in usernames))
+    
+    return {
+        "success": any(r["success"] for r in results),
+        "usernames": usernames,
+        "sites_checked": top_sites,
+        "found_count": sum(r.get("found_count", 0) for r in results),
+        "results": dict(zip(usernames, results)),
+    }
+
+
+def _build_report(result: dict, username: str, sites_checked: int = _REPORT_TOP_SITES) -> str:
+    """
+    Build the serialized identity report for a maigret search result.
+    
+    Args:
+        result: Result dictionary from _run_maigret_async
+        username: The username searched
+        sites_checked: Number of top sites the search covered
+        
+    Returns:
+        JSON string with the report, or the error
+    """
+    if not result["success"]:
+        return dumps_json({
+            "error": result.get("error", "Unknown error"),
+            "username": username
+        })
+    
+    sites = result.get("results", [])
+    n = len(sites)
+    return dumps_json({
+        "report_type": "maigret_investigation",
+        "username": username,
+        "total_sites_checked": sites_checked,
+        "profiles_found": result.get("found_count", n),
+        "platforms": sites,
+        "analysis": {
+            "cross_platform_presence": n > 5,
+            "online_identity_strength": "high" if n > 20 else "medium" if n > 5 else "low"
+        }
+    })
 
 
 def _run_maigret_sync(
@@ -198,13 +452,7 @@ def _run_maigret_sync(
     top_sites: int = 100
 ) -> dict:
     """Synchronous wrapper for maigret."""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(_run_maigret_async(username, timeout, top_sites))
+    return asyncio.run(_run_maigret_async(username, timeout, top_sites))
 
 
 # =============================================================================
@@ -240,7 +488,7 @@ Example usage: Find all social media accounts for username 'johndoe123'."""
     ) -> str:
         """Run maigret username search synchronously."""
         result = _run_maigret_sync(username, timeout, top_sites)
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result)
     
     async def _arun(
         self,
@@ -251,7 +499,50 @@ Example usage: Find all social media accounts for username 'johndoe123'."""
     ) -> str:
         """Run maigret username search asynchronously."""
         result = await _run_maigret_async(username, timeout, top_sites)
-        return json.dumps(result, indent=2, default=str)
+        return dumps_json(result)
+
+
+# =============================================================================
+# Maigret Batch Username Search Tool
+# =============================================================================
+
+class MaigretBatchTool(BaseTool):
+    """
+    Search several usernames at once using concurrent Maigret runs.
+    
+    Useful when an investigation yields username variations or aliases:
+    all of them are searched in parallel instead of one tool call each.
+    """
+    
+    name: str = "maigret_username_search_batch"
+    description: str = """Search several usernames across 500+ social media and web platforms in parallel.
+Uses Maigret, running the searches concurrently.
+Input: usernames (list of exact strings), timeout (seconds, default 30), top_sites (number of sites to check, default 100)
+Returns: Per-username lists of platforms where each username was found with profile URLs.
+Example usage: Check the variations 'johndoe', 'john_doe' and 'johndoe123' together."""
+    args_schema: Type[BaseModel] = MaigretBatchInput
+    
+    def _run(
+        self,
+        usernames: List[str],
+        timeout: int = 30,
+        top_sites: int = 100,
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Run maigret batch search synchronously."""
+        result = asyncio.run(_run_maigret_batch_async(usernames, timeout, top_sites))
+        return dumps_json(result)
+    
+    async def _arun(
+        self,
+        usernames: List[str],
+        timeout: int = 30,
+        top_sites: int = 100,
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Run maigret batch search asynchronously."""
+        result = await _run_maigret_batch_async(usernames, timeout, top_sites)
+        return dumps_json(result)
 
 
 # =============================================================================
@@ -285,28 +576,8 @@ Example usage: Get detailed identity report for a person of interest."""
     ) -> str:
         """Generate maigret report synchronously."""
         # Use more sites for comprehensive report
-        result = _run_maigret_sync(username, timeout=60, top_sites=300)
-        
-        if result["success"]:
-            report = {
-                "report_type": "maigret_investigation",
-                "username": username,
-                "total_sites_checked": 300,
-                "profiles_found": result.get("found_count", len(result.get("results", []))),
-                "platforms": result.get("results", []),
-                "analysis": {
-                    "cross_platform_presence": len(result.get("results", [])) > 5,
-                    "online_identity_strength": "high" if len(result.get("results", [])) > 20 else 
-                                               "medium" if len(result.get("results", [])) > 5 else "low"
-                }
-            }
-        else:
-            report = {
-                "error": result.get("error", "Unknown error"),
-                "username": username
-            }
-        
-        return json.dumps(report, indent=2, default=str)
+        result = _run_maigret_sync(username, timeout=60, top_sites=_REPORT_TOP_SITES)
+        return _build_report(result, username)
     
     async def _arun(
         self,
@@ -315,25 +586,5 @@ Example usage: Get detailed identity report for a person of interest."""
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Generate maigret report asynchronously."""
-        result = await _run_maigret_async(username, timeout=60, top_sites=300)
-        
-        if result["success"]:
-            report = {
-                "report_type": "maigret_investigation",
-                "username": username,
-                "total_sites_checked": 300,
-                "profiles_found": result.get("found_count", len(result.get("results", []))),
-                "platforms": result.get("results", []),
-                "analysis": {
-                    "cross_platform_presence": len(result.get("results", [])) > 5,
-                    "online_identity_strength": "high" if len(result.get("results", [])) > 20 else 
-                                               "medium" if len(result.get("results", [])) > 5 else "low"
-                }
-            }
-        else:
-            report = {
-                "error": result.get("error", "Unknown error"),
-                "username": username
-            }
-        
-        return json.dumps(report, indent=2, default=str)
+        result = await _run_maigret_async(username, timeout=60, top_sites=_REPORT_TOP_SITES)
+        return _build_report(result, username)
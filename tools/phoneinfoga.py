@@ -15,18 +15,21 @@ Provides:
 - PhoneInfogaScanTool: Scan a phone number for OSINT information
 """
 
-import json
 import logging
 import asyncio
 import subprocess
 import shutil
 import os
+import re
+import time
 from typing import Optional, Type, List, Any, Dict
 
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
+from tools.base import dumps_json
+
 logger = logging.getLogger(__name__)
 
 # Default phoneinfoga binary locations
@@ -38,6 +41,22 @@ PHONEINFOGA_BINARY_PATHS = [
     "./phoneinfoga",
 ]
 
+# Lowercased "Label:" of basic number info lines -> result key
+_PHONEINFOGA_FIELDS = {
+    "country": "country",
+    "carrier": "carrier",
+    "line type": "line_type",
+    "linetype": "line_type",
+    "valid": "valid",
+    "local format": "local_format",
+    "international format": "international_format",
+    "e164": "international_format",
+    "country code": "country_code",
+}
+
+# Start of a scanner section: "Running scanner <name>..."
+_SCANNER_RE = re.compile(r'Running scanner\s*(.*?)[.\s]*$')
+
 
 # =============================================================================
 # Input Schemas
@@ -59,14 +78,33 @@ class PhoneInfogaScanInput(BaseModel):
 # Helper Functions
 # =============================================================================
 
-def _find_phoneinfoga_binary() -> Optional[str]:
+def _probe_phoneinfoga_binary() -> Optional[str]:
     """Find phoneinfoga binary in common locations."""
-    for path in PHONEINFOGA_BINARY_PATHS:
-        if shutil.which(path):
-            return path
-        if os.path.isfile(path) and os.access(path, os.X_OK):
-            return path
-    return None
+    # shutil.which also handles explicit paths, checking they are executable files
+    return next((path for path in PHONEINFOGA_BINARY_PATHS if shutil.which(path)), None)
+
+
+# Resolved once at import; call refresh_phoneinfoga() to look again
+_PHONEINFOGA_BIN: Optional[str] = _probe_phoneinfoga_binary()
+
+
+def _find_phoneinfoga_binary() -> Optional[str]:
+    """Get the phoneinfoga binary found at import or by the last refresh."""
+    return _PHONEINFOGA_BIN
+
+
+def refresh_phoneinfoga() -> Optional[str]:
+    """
+    Look for the phoneinfoga binary again.
+    
+    Useful after installing phoneinfoga while the process is running.
+    
+    Returns:
+        Path of the binary, or None if not found
+    """
+    global _PHONEINFOGA_BIN
+    _PHONEINFOGA_BIN = _probe_phoneinfoga_binary()
+    return _PHONEINFOGA_BIN
 
 
 def _check_phoneinfoga_available() -> bool:
@@ -74,64 +112,57 @@ def _check_phoneinfoga_available() -> bool:
     return _find_phoneinfoga_binary() is not None
 
 
-def _parse_phoneinfoga_output(output: str) -> Dict[str, Any]:
+class _PhoneInfogaStreamParser:
     """
-    Parse phoneinfoga scan output.
-    
-    The output contains structured information about the phone number
-    including country, carrier, and scan results from various sources.
+    Incremental parser for phoneinfoga scan output.
     
-    Args:
-        output: Raw CLI output
-        
-    Returns:
-        Parsed results dictionary
+    Lines are fed one at a time as they are read from the subprocess, so
+    the full output never has to be buffered before parsing. The raw lines
+    are only kept when include_raw is set.
     """
-    result = {
-        "raw_output": output,
-        "country": None,
-        "carrier": None,
-        "line_type": None,
-        "valid": None,
-        "local_format": None,
-        "international_format": None,
-        "country_code": None,
-        "scanners": {}
-    }
     
-    lines = output.split('\n')
-    current_scanner = None
+    def __init__(self, include_raw: bool = False):
+        self.result: Dict[str, Any] = {
+            "country": None,
+            "carrier": None,
+            "line_type": None,
+            "valid": None,
+            "local_format": None,
+            "international_format": None,
+            "country_code": None,
+            "scanners": {}
+        }
+        self.saw_error = False
+        self.saw_invalid = False
+        self.raw_lines: Optional[List[str]] = [] if include_raw else None
+        self._current_scanner: Optional[str] = None
     
-    for line in lines:
+    def feed(self, line: str) -> None:
+        """Parse a single line of output into the accumulated result."""
+        if self.raw_lines is not None:
+            self.raw_lines.append(line)
         line = line.strip()
         if not line:
-            continue
+            return
+        
+        lowered = line.lower()
+        self.saw_error = self.saw_error or "error" in lowered
+        self.saw_invalid = self.saw_invalid or "invalid" in lowered
         
         # Parse basic info
-        if "Country:" in line:
-            result["country"] = line.split(":", 1)[1].strip()
-        elif "Carrier:" in line:
-            result["carrier"] = line.split(":", 1)[1].strip()
-        elif "Line type:" in line or "LineType:" in line:
-            result["line_type"] = line.split(":", 1)[1].strip()
-        elif "Valid:" in line:
-            result["valid"] = "true" in line.lower()
-        elif "Local format:" in line:
-            result["local_format"] = line.split(":", 1)[1].strip()
-        elif "International format:" in line or "E164:" in line:
-            result["international_format"] = line.split(":", 1)[1].strip()
-        elif "Country code:" in line:
-            result["country_code"] = line.split(":", 1)[1].strip()
+        label, sep, value = line.partition(":")
+        field = _PHONEINFOGA_FIELDS.get(label.strip().lower()) if sep else None
+        if field:
+            value = value.strip()
+            self.result[field] = "true" in value.lower() if field == "valid" else value
         
-        # Detect scanner sections
-        if "Running scanner" in line:
-            scanner_name = line.split("Running scanner")[-1].strip().strip(".")
-            current_scanner = scanner_name
-            result["scanners"][scanner_name] = {"results": []}
-        elif current_scanner and ("found" in line.lower() or "result" in line.lower()):
-            result["scanners"][current_scanner]["results"].append(line)
-    
-    return result
+        # Detect scanner sections (cheap substring test before the regex)
+        match = _SCANNER_RE.search(line) if "Running scanner" in line else None
+        if match:
+            self._current_scanner = match.group(1)
+            self.result["scanners"][self._current_scanner] = {"results": []}
+        elif self._current_scanner and ("found" in lowered or "result" in lowered):
+            self.result["scanners"][self._current_scanner]["results"].append(line)
 
 
 async def _run_phoneinfoga_async(
@@ -176,27 +207,37 @@ async def _run_phoneinfoga_async(
     logger.info(f"Running phoneinfoga scan for: {normalized_number}")
     logger.debug(f"Command: {' '.join(cmd)}")
     
+    proc = None
     try:
         proc = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.DEVNULL
         )
         
-        stdout, stderr = await asyncio.wait_for(
-            proc.communicate(),
-            timeout=timeout
-        )
+        # Parse stdout line by line as it arrives, under an overall deadline
+        parser = _PhoneInfogaStreamParser(include_raw=logger.isEnabledFor(logging.DEBUG))
+        deadline = time.monotonic() + timeout
+        while True:
+            raw_line = await asyncio.wait_for(
+                proc.stdout.readline(),
+                timeout=max(deadline - time.monotonic(), 0)
+            )
+            if not raw_line:
+                break
+            parser.feed(raw_line.decode('utf-8', errors='replace'))
         
-        output = stdout.decode('utf-8', errors='replace')
-        error_output = stderr.decode('utf-8', errors='replace')
+        await asyncio.wait_for(proc.wait(), timeout=max(deadline - time.monotonic(), 0))
+        parsed = parser.result
         
-        # Parse the output
-        parsed = _parse_phoneinfoga_output(output)
+        # Log the raw scan output for debugging rather than returning it
+        if parser.raw_lines is not None:
+            raw_output = ''.join(parser.raw_lines)
+            logger.debug(f"PhoneInfoga raw output for {normalized_number}:\n{raw_output[:2000]}")
         
         # Check for errors in output
-        if "error" in output.lower() or proc.returncode != 0:
-            if "invalid" in output.lower():
+        if parser.saw_error or proc.returncode != 0:
+            if parser.saw_invalid:
                 return {
                     "success": False,
                     "error": "Invalid phone number format",
@@ -234,6 +275,14 @@ async def _run_phoneinfoga_async(
             "error": str(e),
             "phone_number": phone_number
         }
+    finally:
+        # Reap the scan if it is still running after a timeout, error or cancel
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
 
 
 # =============================================================================
@@ -288,7 +337,7 @@ Important:
         result = asyncio.run(
             _run_phoneinfoga_async(phone_number, timeout)
         )
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
     
     async def _arun(
         self,
@@ -298,7 +347,7 @@ Important:
     ) -> str:
         """Run phoneinfoga scan asynchronously."""
         result = await _run_phoneinfoga_async(phone_number, timeout)
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
 
 
 # =============================================================================
@@ -346,4 +395,5 @@ __all__ = [
     "PhoneInfogaScanInput",
     "get_phoneinfoga_tools",
     "check_phoneinfoga_installation",
+    "refresh_phoneinfoga",
 ]
@@ -8,22 +8,86 @@ Provides:
 - WebScraperTool: Extract content from web pages
 """
 
-import json
-import asyncio
 import logging
-from typing import Optional, Type, Dict, Any, List, ClassVar
+from itertools import islice
+from typing import Optional, Type, Dict, Any, List, ClassVar, Iterable
 
-import aiohttp
 from bs4 import BeautifulSoup
 from pydantic import BaseModel
 
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
-from tools.base import UrlInput
+from tools.base import UrlInput, fetch_text, run_sync, dumps_json
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Maximum characters of page text kept in scrape results
+_MAX_CONTENT_CHARS = 5000
+
+# Elements dropped before extracting page content
+_NOISE_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside')
+
+# Main content candidates, in order of preference: the first selector
+# that matches anywhere in the page wins, like select_one() over
+# 'article', 'main', '.content', '#content', '.post', '.entry'
+_CONTENT_SELECTORS = (
+    {'name': 'article'},
+    {'name': 'main'},
+    {'class_': 'content'},
+    {'id': 'content'},
+    {'class_': 'post'},
+    {'class_': 'entry'},
+)
+
+
+def _class_xpath(name: str) -> str:
+    """XPath for the first element carrying the given class."""
+    return f"(//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')])[1]"
+
+
+if LXML_AVAILABLE:
+    _CONTENT_XPATHS = [
+        etree.XPath('(//article)[1]'),
+        etree.XPath('(//main)[1]'),
+        etree.XPath(_class_xpath('content')),
+        etree.XPath("(//*[@id='content'])[1]"),
+        etree.XPath(_class_xpath('post')),
+        etree.XPath(_class_xpath('entry')),
+    ]
+    _META_DESCRIPTION_XPATH = etree.XPath('string(//meta[@name="description"]/@content)')
+
+
+def _bounded_text(texts: Iterable[str], limit: int = _MAX_CONTENT_CHARS) -> str:
+    """
+    Join stripped text chunks with spaces, like get_text(separator=' ', strip=True).
+    
+    Stops consuming chunks once the text exceeds limit characters, and cuts
+    the last chunk so at most limit + 1 characters are returned. Large pages
+    are not fully extracted only to be truncated, and callers can still
+    tell the text was cut by checking len(result) > limit.
+    """
+    parts = []
+    total = 0
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if parts:
+            total += 1
+        parts.append(text[:limit + 1 - total])
+        total += len(text)
+        if total > limit:
+            break
+    return ' '.join(parts)
+
 
 class WebScraperTool(BaseTool):
     """
@@ -46,19 +110,12 @@ class WebScraperTool(BaseTool):
     ) -> str:
         """Scrape web page synchronously."""
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self._arun(url, run_manager)
-                    )
-                    return future.result(timeout=60)
-            else:
-                return loop.run_until_complete(self._arun(url, run_manager))
-        except RuntimeError:
-            return asyncio.run(self._arun(url, run_manager))
+            # Only the request runs on the shared tool loop; parse in this thread
+            status, html = run_sync(fetch_text(url, timeout=30, ssl=False))
+            return self._build_result(url, status, html)
+        except Exception as e:
+            logger.error(f"Scraping failed for {url}: {e}")
+            return dumps_json({"error": str(e), "url": url})
     
     async def _arun(
         self,
@@ -67,35 +124,99 @@ class WebScraperTool(BaseTool):
     ) -> str:
         """Scrape web page asynchronously."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    },
-                    timeout=aiohttp.ClientTimeout(total=30),
-                    ssl=False  # Some OSINT sites have cert issues
-                ) as response:
-                    if response.status != 200:
-                        return json.dumps({
-                            "error": f"HTTP {response.status}",
-                            "url": url
-                        })
-                    
-                    html = await response.text()
-                    content = self._extract_content(html, url)
-                    return json.dumps(content)
-                    
+            # Some OSINT sites have cert issues
+            status, html = await fetch_text(url, timeout=30, ssl=False)
+            return self._build_result(url, status, html)
         except Exception as e:
             logger.error(f"Scraping failed for {url}: {e}")
-            return json.dumps({"error": str(e), "url": url})
+            return dumps_json({"error": str(e), "url": url})
+    
+    def _build_result(self, url: str, status: int, html: str) -> str:
+        """Turn a fetched page into the tool's JSON result."""
+        if status != 200:
+            return dumps_json({
+                "error": f"HTTP {status}",
+                "url": url
+            })
+        return dumps_json(self._extract_content(html, url))
     
     def _extract_content(self, html: str, url: str) -> Dict[str, Any]:
         """Extract structured content from HTML."""
-        soup = BeautifulSoup(html, 'lxml')
+        extracted = None
+        if LXML_AVAILABLE:
+            try:
+                extracted = self._extract_with_lxml(html)
+            except (etree.ParserError, ValueError) as e:
+                logger.debug(f"lxml could not parse {url}, using BeautifulSoup: {e}")
+        if extracted is None:
+            extracted = self._extract_with_bs4(html)
+        
+        # Limit content length
+        main_content = extracted["content"]
+        if len(main_content) > _MAX_CONTENT_CHARS:
+            main_content = main_content[:_MAX_CONTENT_CHARS] + "..."
+        
+        return {
+            "url": url,
+            "title": extracted["title"],
+            "meta_description": extracted["meta_description"],
+            "content": main_content,
+            "content_length": len(main_content),
+            "links": extracted["links"],
+            "images": extracted["images"]
+        }
+    
+    def _extract_with_lxml(self, html: str) -> Dict[str, Any]:
+        """Extract page fields with lxml.html and precompiled XPath."""
+        doc = lxml.html.document_fromstring(html)
         
         # Remove script and style elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
+        etree.strip_elements(doc, *_NOISE_TAGS, with_tail=False)
+        
+        title = (doc.findtext('.//title') or "").strip()
+        meta_desc = _META_DESCRIPTION_XPATH(doc)
+        
+        # Extract main content, falling back to the body
+        main_content = ""
+        for xpath in _CONTENT_XPATHS:
+            matches = xpath(doc)
+            if matches:
+                main_content = _bounded_text(matches[0].itertext())
+                break
+        if not main_content:
+            body = doc.find('body')
+            if body is not None:
+                main_content = _bounded_text(body.itertext())
+        
+        # Extract links
+        links = []
+        for a in islice(doc.iterfind('.//a[@href]'), 20):
+            href = a.get('href', '')
+            text = ''.join(t.strip() for t in a.itertext())
+            if href and text and not href.startswith('#'):
+                links.append({"text": text[:100], "href": href})
+        
+        # Extract images
+        images = []
+        for img in islice(doc.iterfind('.//img[@src]'), 10):
+            src = img.get('src', '')
+            if src:
+                images.append({"src": src, "alt": img.get('alt', '')})
+        
+        return {
+            "title": title,
+            "meta_description": meta_desc,
+            "content": main_content,
+            "links": links,
+            "images": images
+        }
+    
+    def _extract_with_bs4(self, html: str) -> Dict[str, Any]:
+        """Extract page fields with BeautifulSoup (fallback parser)."""
+        soup = BeautifulSoup(html, 'lxml' if LXML_AVAILABLE else 'html.parser')
+        
+        # Remove script and style elements
+        for element in soup(list(_NOISE_TAGS)):
             element.decompose()
         
         # Extract title
@@ -113,25 +234,21 @@ class WebScraperTool(BaseTool):
         # Extract main content
         # Try to find article or main content areas
         main_content = ""
-        for selector in ['article', 'main', '.content', '#content', '.post', '.entry']:
-            content_elem = soup.select_one(selector)
+        for selector in _CONTENT_SELECTORS:
+            content_elem = soup.find(**selector)
             if content_elem:
-                main_content = content_elem.get_text(separator=' ', strip=True)
+                main_content = _bounded_text(content_elem.stripped_strings)
                 break
         
         # Fallback to body content
         if not main_content:
             body = soup.find('body')
             if body:
-                main_content = body.get_text(separator=' ', strip=True)
-        
-        # Limit content length
-        if len(main_content) > 5000:
-            main_content = main_content[:5000] + "..."
+                main_content = _bounded_text(body.stripped_strings)
         
         # Extract links
         links = []
-        for a in soup.find_all('a', href=True)[:20]:
+        for a in soup.find_all('a', href=True, limit=20):
             href = a.get('href', '')
             text = a.get_text(strip=True)
             if href and text and not href.startswith('#'):
@@ -139,18 +256,16 @@ class WebScraperTool(BaseTool):
         
         # Extract images
         images = []
-        for img in soup.find_all('img', src=True)[:10]:
+        for img in soup.find_all('img', src=True, limit=10):
             src = img.get('src', '')
             alt = img.get('alt', '')
             if src:
                 images.append({"src": src, "alt": alt})
         
         return {
-            "url": url,
             "title": title,
             "meta_description": meta_desc,
             "content": main_content,
-            "content_length": len(main_content),
             "links": links,
             "images": images
         }
@@ -231,19 +346,16 @@ class GoogleDorkBuilderTool(BaseTool):
         ],
     }
     
-    def _run(
-        self,
-        target: str,
-        dork_type: str = "basic",
-        run_manager: Optional[CallbackManagerForToolRun] = None
-    ) -> str:
-        """Generate Google dork queries for the target."""
-        templates = self.DORK_TEMPLATES.get(dork_type, self.DORK_TEMPLATES["basic"])
-        
-        dorks = []
-        for template in templates:
-            dork = template.format(target=target)
-            dorks.append(dork)
+    # Templates pre-split around {target}, so building a dork is a str.join
+    _SPLIT_TEMPLATES: ClassVar[Dict[str, List[List[str]]]] = {
+        dork_type: [template.split('{target}') for template in templates]
+        for dork_type, templates in DORK_TEMPLATES.items()
+    }
+    
+    def _build(self, target: str, dork_type: str = "basic") -> str:
+        """Build the dork list JSON shared by the sync and async paths."""
+        templates = self._SPLIT_TEMPLATES.get(dork_type, self._SPLIT_TEMPLATES["basic"])
+        dorks = [target.join(parts) for parts in templates]
         
         result = {
             "target": target,
@@ -252,4 +364,22 @@ class GoogleDorkBuilderTool(BaseTool):
             "usage": "Use these queries with DuckDuckGo or a search engine"
         }
         
-        return json.dumps(result, indent=2)
+        return dumps_json(result, indent=True)
+    
+    def _run(
+        self,
+        target: str,
+        dork_type: str = "basic",
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Generate Google dork queries for the target."""
+        return self._build(target, dork_type)
+    
+    async def _arun(
+        self,
+        target: str,
+        dork_type: str = "basic",
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Generate dork queries inline instead of in an executor thread."""
+        return self._build(target, dork_type)
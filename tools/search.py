@@ -11,28 +11,50 @@ Provides:
 """
 
 import os
-import json
+import re
 import asyncio
 import logging
-from typing import Optional, Type
+import functools
+from typing import Optional, Type, List, Dict, Any
 from urllib.parse import quote_plus
 
-import aiohttp
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from pydantic import BaseModel
 
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
-from tools.base import WebSearchInput, GoogleDorkInput
+from tools.base import WebSearchInput, GoogleDorkInput, fetch_text, run_sync, dumps_json
+
+try:
+    from tavily import TavilyClient
+    TAVILY_AVAILABLE = True
+except ImportError:
+    TAVILY_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Only build the DOM for DuckDuckGo result blocks. The class attribute is
+# still a raw string while parsing, so match "result" as a whole word.
+_DDG_STRAINER = SoupStrainer('div', class_=re.compile(r'(?:^|\s)result(?:\s|$)'))
+
 
 # =============================================================================
 # Tavily Search Tool
 # =============================================================================
 
+@functools.lru_cache(maxsize=1)
+def _get_tavily_client(api_key: str) -> "TavilyClient":
+    """Get a Tavily client, reused until the API key changes."""
+    return TavilyClient(api_key=api_key)
+
+
 class TavilySearchTool(BaseTool):
     """
     Tavily AI-powered web search tool.
@@ -54,23 +76,7 @@ class TavilySearchTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Execute Tavily search synchronously."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # Create new loop in thread
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self._arun(query, max_results, run_manager)
-                    )
-                    return future.result(timeout=60)
-            else:
-                return loop.run_until_complete(
-                    self._arun(query, max_results, run_manager)
-                )
-        except RuntimeError:
-            return asyncio.run(self._arun(query, max_results, run_manager))
+        return run_sync(self._arun(query, max_results, run_manager))
     
     async def _arun(
         self,
@@ -82,16 +88,22 @@ class TavilySearchTool(BaseTool):
         tavily_key = os.getenv("TAVILY_API_KEY", "")
         
         if not tavily_key:
-            return json.dumps({
+            return dumps_json({
                 "error": "TAVILY_API_KEY not configured",
                 "results": []
             })
         
+        if not TAVILY_AVAILABLE:
+            return dumps_json({
+                "error": "tavily package not installed. Run: pip install tavily-python",
+                "results": []
+            })
+        
         try:
-            from tavily import TavilyClient
-            
-            client = TavilyClient(api_key=tavily_key)
-            response = client.search(
+            client = _get_tavily_client(tavily_key)
+            # The client is blocking; keep the HTTP round-trip off the event loop
+            response = await asyncio.to_thread(
+                client.search,
                 query=query,
                 search_depth="advanced",
                 max_results=min(max_results, 20),
@@ -121,26 +133,98 @@ class TavilySearchTool(BaseTool):
                     "score": item.get("score", 0)
                 })
             
-            return json.dumps({
+            return dumps_json({
                 "query": query,
                 "count": len(results),
                 "results": results
             })
             
-        except ImportError:
-            return json.dumps({
-                "error": "tavily package not installed. Run: pip install tavily-python",
-                "results": []
-            })
         except Exception as e:
             logger.error(f"Tavily search failed: {e}")
-            return json.dumps({"error": str(e), "results": []})
+            return dumps_json({"error": str(e), "results": []})
 
 
 # =============================================================================
 # DuckDuckGo Search Tool
 # =============================================================================
 
+def _ddg_result(title: str, href: str, snippet: str) -> Optional[Dict[str, Any]]:
+    """Build a result entry, skipping blocks without a title or link."""
+    if not (title and href):
+        return None
+    return {
+        "title": title,
+        "url": href,
+        "content": snippet,
+        "score": 0.5
+    }
+
+
+def _parse_ddg_selectolax(html: str, max_results: int) -> List[Dict[str, Any]]:
+    """Parse DuckDuckGo result blocks with selectolax."""
+    results = []
+    for node in LexborHTMLParser(html).css('div.result')[:max_results]:
+        title_elem = node.css_first('a.result__a')
+        if title_elem is None:
+            continue
+        snippet_elem = node.css_first('a.result__snippet')
+        result = _ddg_result(
+            title_elem.text(strip=True),
+            title_elem.attributes.get('href') or '',
+            snippet_elem.text(strip=True) if snippet_elem is not None else ""
+        )
+        if result:
+            results.append(result)
+    return results
+
+
+def _parse_ddg_bs4(html: str, max_results: int) -> List[Dict[str, Any]]:
+    """Parse DuckDuckGo result blocks with BeautifulSoup."""
+    results = []
+    soup = BeautifulSoup(html, 'lxml', parse_only=_DDG_STRAINER)
+    
+    for div in soup.find_all('div', class_='result', limit=max_results):
+        try:
+            title_elem = div.find('a', class_='result__a')
+            if not title_elem:
+                continue
+            
+            snippet_elem = div.find('a', class_='result__snippet')
+            result = _ddg_result(
+                title_elem.get_text(strip=True),
+                title_elem.get('href', ''),
+                snippet_elem.get_text(strip=True) if snippet_elem else ""
+            )
+            if result:
+                results.append(result)
+        except Exception as e:
+            logger.debug(f"Error parsing result: {e}")
+            continue
+    return results
+
+
+def _parse_ddg_results(html: str, max_results: int) -> List[Dict[str, Any]]:
+    """Extract up to max_results results from a DuckDuckGo HTML page."""
+    if SELECTOLAX_AVAILABLE:
+        return _parse_ddg_selectolax(html, max_results)
+    return _parse_ddg_bs4(html, max_results)
+
+
+def _ddg_url(query: str) -> str:
+    """DuckDuckGo HTML endpoint URL for a query."""
+    return f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
+
+
+def _ddg_response(query: str, status: int, html: str, max_results: int) -> str:
+    """Build the search result JSON from a fetched DuckDuckGo page."""
+    results = _parse_ddg_results(html, max_results) if status == 200 else []
+    return dumps_json({
+        "query": query,
+        "count": len(results),
+        "results": results
+    })
+
+
 class DuckDuckGoSearchTool(BaseTool):
     """
     DuckDuckGo web search tool.
@@ -163,21 +247,12 @@ class DuckDuckGoSearchTool(BaseTool):
     ) -> str:
         """Execute DuckDuckGo search synchronously."""
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self._arun(query, max_results, run_manager)
-                    )
-                    return future.result(timeout=60)
-            else:
-                return loop.run_until_complete(
-                    self._arun(query, max_results, run_manager)
-                )
-        except RuntimeError:
-            return asyncio.run(self._arun(query, max_results, run_manager))
+            # Only the request runs on the shared tool loop; parse in this thread
+            status, html = run_sync(fetch_text(_ddg_url(query), timeout=30))
+            return _ddg_response(query, status, html, max_results)
+        except Exception as e:
+            logger.error(f"DuckDuckGo search failed: {e}")
+            return dumps_json({"error": str(e), "results": []})
     
     async def _arun(
         self,
@@ -186,55 +261,12 @@ class DuckDuckGoSearchTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Execute DuckDuckGo search asynchronously."""
-        results = []
-        
         try:
-            url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    },
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'lxml')
-                        
-                        for div in soup.find_all('div', class_='result')[:max_results]:
-                            try:
-                                title_elem = div.find('a', class_='result__a')
-                                if not title_elem:
-                                    continue
-                                
-                                title = title_elem.get_text(strip=True)
-                                href = title_elem.get('href', '')
-                                
-                                snippet_elem = div.find('a', class_='result__snippet')
-                                snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
-                                
-                                if title and href:
-                                    results.append({
-                                        "title": title,
-                                        "url": href,
-                                        "content": snippet,
-                                        "score": 0.5
-                                    })
-                            except Exception as e:
-                                logger.debug(f"Error parsing result: {e}")
-                                continue
-            
-            return json.dumps({
-                "query": query,
-                "count": len(results),
-                "results": results
-            })
-            
+            status, html = await fetch_text(_ddg_url(query), timeout=30)
+            return _ddg_response(query, status, html, max_results)
         except Exception as e:
             logger.error(f"DuckDuckGo search failed: {e}")
-            return json.dumps({"error": str(e), "results": []})
+            return dumps_json({"error": str(e), "results": []})
 
 
 # =============================================================================
@@ -255,16 +287,15 @@ class GoogleDorkBuilderTool(BaseTool):
     Returns the constructed query for use with other search tools."""
     args_schema: Type[BaseModel] = GoogleDorkInput
     
-    def _run(
+    def _build(
         self,
         base_query: str,
         site: Optional[str] = None,
         filetype: Optional[str] = None,
         intitle: Optional[str] = None,
-        inurl: Optional[str] = None,
-        run_manager: Optional[CallbackManagerForToolRun] = None
+        inurl: Optional[str] = None
     ) -> str:
-        """Build and return a Google dork query."""
+        """Build the dork query JSON shared by the sync and async paths."""
         parts = [base_query]
         
         if site:
@@ -278,7 +309,7 @@ class GoogleDorkBuilderTool(BaseTool):
         
         dork_query = ' '.join(parts)
         
-        return json.dumps({
+        return dumps_json({
             "dork_query": dork_query,
             "components": {
                 "base": base_query,
@@ -289,6 +320,18 @@ class GoogleDorkBuilderTool(BaseTool):
             }
         })
     
+    def _run(
+        self,
+        base_query: str,
+        site: Optional[str] = None,
+        filetype: Optional[str] = None,
+        intitle: Optional[str] = None,
+        inurl: Optional[str] = None,
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Build and return a Google dork query."""
+        return self._build(base_query, site, filetype, intitle, inurl)
+    
     async def _arun(
         self,
         base_query: str,
@@ -298,5 +341,5 @@ class GoogleDorkBuilderTool(BaseTool):
         inurl: Optional[str] = None,
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
-        """Async version of dork builder."""
-        return self._run(base_query, site, filetype, intitle, inurl, run_manager)
+        """Async version of dork builder (pure string work, no awaits)."""
+        return self._build(base_query, site, filetype, intitle, inurl)
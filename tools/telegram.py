@@ -14,16 +14,29 @@ Uses Telethon library for direct, robust Telegram integration.
 """
 
 import os
-import json
+import time
+import atexit
 import asyncio
 import logging
-from typing import Optional, Type
+import threading
+from typing import Optional, Type, Any, Coroutine, Dict, List
 
 from pydantic import BaseModel, Field
 
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 
+from tools.base import run_sync, run_in_background, dumps_json
+
+try:
+    from integrations.telegram.telethon_client import (
+        TelethonClient,
+        TelethonReportPublisher,
+    )
+    TELETHON_CLIENT_AVAILABLE = True
+except ImportError:
+    TELETHON_CLIENT_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +69,202 @@ class TelegramSimpleInput(BaseModel):
     chat_id: Optional[str] = Field(default=None, description="Target chat ID (optional)")
 
 
+# =============================================================================
+# Module State
+# =============================================================================
+
+# Minimum spacing between report publishes to the same dialog (seconds),
+# keeping bursts of reports under Telegram's flood limits
+_PUBLISH_INTERVAL = 1.0
+
+_next_publish_at: Dict[str, float] = {}
+_publish_lock = threading.Lock()
+
+# Default dialog from TELEGRAM_TARGET_DIALOG, read on first use
+_default_target: Optional[str] = None
+
+# Telethon client used by the tools; only touched on the background loop
+_client: Optional["TelethonClient"] = None
+_client_lock = asyncio.Lock()
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+# Seconds a sync tool call may run before it is cancelled
+_SYNC_TIMEOUT = 60
+
+
+def _run_coro_sync(coro: Coroutine[Any, Any, str]) -> str:
+    """
+    Run a tool coroutine from sync code on the shared background loop.
+    
+    The timeout is applied on the loop itself, so a send that runs too long
+    is cancelled there and its client is free for the next call.
+    """
+    try:
+        return run_sync(
+            asyncio.wait_for(coro, timeout=_SYNC_TIMEOUT),
+            timeout=_SYNC_TIMEOUT + 5
+        )
+    except TimeoutError:
+        logger.warning(f"Telegram tool call timed out after {_SYNC_TIMEOUT}s")
+        return dumps_json({
+            "error": f"Timeout after {_SYNC_TIMEOUT}s",
+            "success": False
+        })
+
+
+def _get_default_target() -> str:
+    """Return the default target dialog, reading the environment once."""
+    global _default_target
+    
+    if _default_target is None:
+        _default_target = os.getenv("TELEGRAM_TARGET_DIALOG", "")
+    return _default_target
+
+
+def refresh_default_target() -> str:
+    """
+    Re-read TELEGRAM_TARGET_DIALOG from the environment.
+    
+    Call this after changing the variable at runtime; the value is
+    otherwise read once and reused by the publish tools.
+    
+    Returns:
+        The new default target dialog ("" if not set)
+    """
+    global _default_target
+    
+    _default_target = None
+    return _get_default_target()
+
+
+def _reserve_publish_slot(target: str) -> float:
+    """
+    Reserve the next publish slot for a dialog.
+    
+    Returns:
+        time.monotonic() value at which the publish may go out
+    """
+    with _publish_lock:
+        slot = max(time.monotonic(), _next_publish_at.get(target, 0.0))
+        _next_publish_at[target] = slot + _PUBLISH_INTERVAL
+    return slot
+
+
+def _release_publish_slot(target: str, slot: float) -> None:
+    """
+    Hand back a reserved slot that will not be used.
+    
+    Only the latest reservation for a dialog can be returned; cancelling
+    an earlier one leaves a gap of one interval in the queue.
+    """
+    with _publish_lock:
+        if _next_publish_at.get(target) == slot + _PUBLISH_INTERVAL:
+            _next_publish_at[target] = slot
+
+
+def _wait_for_publish_slot_sync(target: str) -> None:
+    """Block until the dialog's next publish slot."""
+    delay = _reserve_publish_slot(target) - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+async def _wait_for_publish_slot(target: str) -> None:
+    """Wait for the dialog's next publish slot, releasing it if cancelled."""
+    slot = _reserve_publish_slot(target)
+    delay = slot - time.monotonic()
+    if delay <= 0:
+        return
+    try:
+        await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        _release_publish_slot(target, slot)
+        raise
+
+
+async def _get_client() -> "TelethonClient":
+    """
+    Return the tools' Telethon client, connecting it on first use.
+    
+    Must run on the shared background loop: Telethon binds a client to the
+    loop it connected on, and tool calls arrive from many short-lived
+    loops. The client is reused and left connected, so sends do not pay
+    for a new connection and session load each time. It is separate from
+    get_telegram_client(), which the API routes connect and disconnect on
+    their own request loops.
+    """
+    global _client
+    
+    if not TELETHON_CLIENT_AVAILABLE:
+        raise ImportError("Telethon client not available")
+    
+    async with _client_lock:
+        if _client is None:
+            _client = TelethonClient()
+        if not _client.is_connected:
+            await _client.connect()
+    return _client
+
+
+@atexit.register
+def _disconnect_client() -> None:
+    """Disconnect the tools' client at interpreter exit."""
+    if _client is None or not _client.is_connected:
+        return
+    try:
+        run_sync(_client.disconnect(), timeout=5)
+    except Exception as e:
+        logger.debug(f"Failed to disconnect Telegram client: {e}")
+
+
+async def _send(chat_id: str, text: str) -> Dict[str, Any]:
+    """Send an HTML message and return the result dict (background loop)."""
+    try:
+        client = await _get_client()
+        
+        return await client.send_message(
+            chat_id=chat_id,
+            text=text,
+            parse_mode="html"
+        )
+        
+    except ImportError:
+        return {
+            "error": "Telethon client not available",
+            "success": False
+        }
+    except Exception as e:
+        logger.error(f"Failed to send Telegram message: {e}")
+        return {
+            "error": str(e),
+            "success": False
+        }
+
+
+async def _publish_report(report: str, query: str, target: str) -> Dict[str, Any]:
+    """Publish a report and return the publisher result (background loop)."""
+    publisher = TelethonReportPublisher(
+        target_dialog=target,
+        client=await _get_client()
+    )
+    
+    return await publisher.publish_report(
+        report_markdown=report,
+        query=query,
+        dialog_name=target
+    )
+
+
+async def _list_dialogs() -> List[Dict[str, Any]]:
+    """List recent dialogs (background loop)."""
+    client = await _get_client()
+    return await client.list_dialogs(limit=20)
+
+
 # =============================================================================
 # Telegram Send Tool
 # =============================================================================
@@ -81,22 +290,7 @@ class TelegramMCPSendTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Send message synchronously."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self._arun(dialog_name, text, send_direct, run_manager)
-                    )
-                    return future.result(timeout=60)
-            else:
-                return loop.run_until_complete(
-                    self._arun(dialog_name, text, send_direct, run_manager)
-                )
-        except RuntimeError:
-            return asyncio.run(self._arun(dialog_name, text, send_direct, run_manager))
+        return _run_coro_sync(self._arun(dialog_name, text, send_direct))
     
     async def _arun(
         self,
@@ -106,31 +300,7 @@ class TelegramMCPSendTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Send message asynchronously via Telethon."""
-        try:
-            # Import the Telethon client
-            from integrations.telegram.telethon_client import TelethonClient
-            
-            client = TelethonClient()
-            
-            result = await client.send_message(
-                chat_id=dialog_name,
-                text=text,
-                parse_mode="html"
-            )
-            
-            return json.dumps(result)
-            
-        except ImportError:
-            return json.dumps({
-                "error": "Telethon client not available",
-                "success": False
-            })
-        except Exception as e:
-            logger.error(f"Failed to send Telegram message: {e}")
-            return json.dumps({
-                "error": str(e),
-                "success": False
-            })
+        return dumps_json(await run_in_background(_send(dialog_name, text)))
 
 
 # =============================================================================
@@ -158,22 +328,12 @@ class TelegramMCPPublishReportTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Publish report synchronously."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self._arun(report, query, dialog_name, run_manager)
-                    )
-                    return future.result(timeout=60)
-            else:
-                return loop.run_until_complete(
-                    self._arun(report, query, dialog_name, run_manager)
-                )
-        except RuntimeError:
-            return asyncio.run(self._arun(report, query, dialog_name, run_manager))
+        target = dialog_name or _get_default_target()
+        if target:
+            # Wait for the slot before the timed call, so pacing a burst of
+            # publishes never counts toward the sync timeout
+            _wait_for_publish_slot_sync(target)
+        return _run_coro_sync(self._publish(report, query, target))
     
     async def _arun(
         self,
@@ -183,56 +343,32 @@ class TelegramMCPPublishReportTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Publish report asynchronously."""
-        from datetime import datetime
-        
-        # Format the report
-        formatted = f"""🔍 **OSINT Intelligence Report**
-📅 {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}
-🎯 Query: `{query}`
-
----
-
-{report}
-
----
-_Generated by OSINT OA_
-"""
-        
-        # Truncate if too long for Telegram
-        if len(formatted) > 4000:
-            formatted = formatted[:3950] + "\n\n... _[Report truncated]_"
-        
         # Use default dialog if not specified
-        target = dialog_name or os.getenv("TELEGRAM_TARGET_DIALOG", "")
-        
+        target = dialog_name or _get_default_target()
+        if target:
+            await _wait_for_publish_slot(target)
+        return await self._publish(report, query, target)
+    
+    async def _publish(self, report: str, query: str, target: str) -> str:
+        """Publish a report once its publish slot has come up."""
         if not target:
-            return json.dumps({
+            return dumps_json({
                 "error": "No target dialog specified and TELEGRAM_TARGET_DIALOG not set",
                 "success": False
             })
         
         try:
-            from integrations.telegram.telethon_client import TelethonReportPublisher
-            
-            publisher = TelethonReportPublisher(target_dialog=target)
+            result = await run_in_background(_publish_report(report, query, target))
             
-            result = await publisher.publish_report(
-                report_markdown=report,
-                query=query,
-                dialog_name=target
-            )
-            
-            await publisher.close()
-            
-            return json.dumps({
+            return dumps_json({
                 **result,
-                "report_length": len(formatted),
+                "report_length": len(report),
                 "query": query
             })
             
         except Exception as e:
             logger.error(f"Failed to publish report: {e}")
-            return json.dumps({
+            return dumps_json({
                 "error": str(e),
                 "success": False
             })
@@ -261,20 +397,7 @@ class TelegramMCPListDialogsTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """List dialogs synchronously."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self._arun(only_unread, run_manager)
-                    )
-                    return future.result(timeout=60)
-            else:
-                return loop.run_until_complete(self._arun(only_unread, run_manager))
-        except RuntimeError:
-            return asyncio.run(self._arun(only_unread, run_manager))
+        return _run_coro_sync(self._arun(only_unread))
     
     async def _arun(
         self,
@@ -283,22 +406,16 @@ class TelegramMCPListDialogsTool(BaseTool):
     ) -> str:
         """List dialogs asynchronously."""
         try:
-            from integrations.telegram.telethon_client import TelethonClient
-            
-            client = TelethonClient()
-            
-            dialogs = await client.list_dialogs(limit=20)
-            
-            await client.disconnect()
+            dialogs = await run_in_background(_list_dialogs())
             
-            return json.dumps({
+            return dumps_json({
                 "count": len(dialogs),
                 "dialogs": dialogs
             })
             
         except Exception as e:
             logger.error(f"Failed to list dialogs: {e}")
-            return json.dumps({
+            return dumps_json({
                 "error": str(e),
                 "dialogs": []
             })
@@ -328,17 +445,7 @@ class TelegramPublishTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Publish message synchronously."""
-        target = chat_id or os.getenv("TELEGRAM_TARGET_DIALOG", "")
-        
-        if not target:
-            return json.dumps({
-                "success": False,
-                "error": "No chat_id specified and TELEGRAM_TARGET_DIALOG not set"
-            })
-        
-        # Use the MCP send tool
-        send_tool = TelegramMCPSendTool()
-        return send_tool._run(target, message, True, run_manager)
+        return _run_coro_sync(self._arun(message, chat_id))
     
     async def _arun(
         self,
@@ -347,13 +454,12 @@ class TelegramPublishTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Publish message asynchronously."""
-        target = chat_id or os.getenv("TELEGRAM_TARGET_DIALOG", "")
+        target = chat_id or _get_default_target()
         
         if not target:
-            return json.dumps({
+            return dumps_json({
                 "success": False,
                 "error": "No chat_id specified and TELEGRAM_TARGET_DIALOG not set"
             })
         
-        send_tool = TelegramMCPSendTool()
-        return await send_tool._arun(target, message, True, run_manager)
+        return dumps_json(await run_in_background(_send(target, message)))